@@ -0,0 +1,83 @@
+"""
+Equality check and microbenchmark for author page parsing.
+
+    python -m backend.bench_author_pages [--rounds 20] [--cache PATH]
+
+bench_data/author_pages holds gzipped author pages laid out like the vendor's: a large page
+(styles, inline state, navigation, product tiles with their own toggle texts) around the
+autor-avatar, autor-name and autor-portrait containers. They are reconstructions, not
+captures, so no vendor content ends up in the repository. --cache additionally reads every
+author page stored in a cache.db of a running install.
+
+Every page is parsed with the original full-tree html.parser extraction and with
+parse_author_page using html.parser and lxml. All of them have to agree before anything
+is timed.
+"""
+import argparse
+import gzip
+import sqlite3
+from importlib.util import find_spec
+from pathlib import Path
+from time import perf_counter
+from bs4 import BeautifulSoup
+from backend.services.scrape import parse_author_page, author
+
+PAGES = Path(__file__).parent / "bench_data" / "author_pages"
+
+
+def legacy_parse_author_page(data) -> dict:
+    """The author page extraction of scrape_author_data before parse_author_page, kept as the reference."""
+    soup = BeautifulSoup(data, "html.parser")
+    page = {}
+    if (avatar:=soup.find(class_="autor-avatar")) and (img:=avatar.find("img")):
+        page["bild"] = img.get("src")
+    if (name:=soup.find(class_="autor-name")):
+        page["name"] = name.get_text(strip=True)
+    if (bio_container := soup.find(class_="autor-portrait")):
+        if (bio_div := bio_container.find("div", class_="toggle-text-content")):
+            page["bio"] = bio_div.get_text().strip()
+    return page
+
+def load_pages(cache: Path = None) -> dict[str, str]:
+    pages = {path.name: gzip.decompress(path.read_bytes()).decode("utf-8") for path in sorted(PAGES.glob("*.html.gz"))}
+    if cache:
+        conn = sqlite3.connect(cache)
+        for key, data in conn.execute("SELECT key, data FROM entries WHERE key LIKE ?", (f"%{author}%",)):
+            pages[key] = data.decode("utf-8") if isinstance(data, bytes) else data
+        conn.close()
+    return pages
+
+def time_it(fn, pages: list[str], rounds: int) -> float:
+    start = perf_counter()
+    for _ in range(rounds):
+        for data in pages:
+            fn(data)
+    return perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Check parse_author_page against the full-tree parse and time it")
+    parser.add_argument("--rounds", type=int, default=20, help="passes over the pages per implementation")
+    parser.add_argument("--cache", type=Path, help="cache.db to read additional author pages from")
+    args = parser.parse_args()
+    pages = load_pages(args.cache)
+    assert pages, "no author pages found"
+
+    parsers = {"html.parser": lambda data: parse_author_page(data, "html.parser")}
+    if find_spec("lxml"):
+        parsers["lxml"] = lambda data: parse_author_page(data, "lxml")
+    for name, data in pages.items():
+        expected = legacy_parse_author_page(data)
+        for label, fn in parsers.items():
+            assert (got := fn(data)) == expected, f"{name} with {label}: expected {expected!r}, got {got!r}"
+    print(f"{len(pages)} author pages parse identically with {', '.join(parsers)}")
+
+    size = sum(len(data.encode()) for data in pages.values())
+    calls = len(pages) * args.rounds
+    legacy = time_it(legacy_parse_author_page, list(pages.values()), args.rounds)
+    print(f"full tree, html.parser: {legacy:.3f}s ({legacy / calls * 1e3:.2f} ms/page, {size / len(pages) / 1024:.0f} KiB/page)")
+    for label, fn in parsers.items():
+        current = time_it(fn, list(pages.values()), args.rounds)
+        print(f"strainer, {label + ':':<13} {current:.3f}s ({current / calls * 1e3:.2f} ms/page, {legacy / current:.2f}x)")
+
+if __name__ == "__main__":
+    main()
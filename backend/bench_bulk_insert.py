@@ -0,0 +1,135 @@
+"""
+Equality check and benchmark for saving a large new author.
+
+    python -m backend.bench_bulk_insert [--editions 5000] [--seed 7]
+
+Builds a synthetic author (series with near-duplicate names that get unioned, books sharing a
+position that get merged) and saves it into fresh file-backed SQLite databases three times:
+with the ORM path of add_books_to_author, with bulk_add_books_to_author, and with the ORM path
+as it was before series were deduplicated one after another (asyncio.gather on one session).
+The ORM and bulk results have to be the same book/edition/series graph. Warnings raised while
+saving and editions left pointing at a deleted book are reported for every variant.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import tempfile
+import warnings
+from pathlib import Path
+from time import perf_counter
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.datamodels import Author, Book, Edition, Series, medium_priority
+from backend.dependencies import get_logger
+from backend.services.author_service import auto_union_series, bulk_add_books_to_author, add_books_to_author, clean_series_duplicates
+from backend.services.edition_service import existing_edition_keys
+from backend.services.scrape import clean_title, clean_edition_titles
+
+
+async def legacy_add_books_to_author(author: Author, session: AsyncSession, books_data: list):
+    """add_books_to_author before the sequential series dedupe, kept verbatim as the reference."""
+    found_series: dict[str, Series] = {}
+    sanity_dedub = set() # see A1040945738 for funky shit
+    in_db = await existing_edition_keys(session, (ed["key"] for eds, _ in books_data for ed in eds))
+    for eds, series_title in books_data:
+        if not eds:
+            get_logger().debug(f"Skipping book because it has no editions")
+            continue
+        eds = sorted(eds, key=lambda x: medium_priority.get(x["medium"], 10))
+        if any([ed["key"] in in_db for ed in eds]):
+            get_logger().debug(f"Skipping {eds[0]['key']} because it already exists")
+            continue
+        book = Book(autor_key=author.key)
+        book.name, book.bild, book.position = clean_title(eds[0].get("titel")), eds[0].get("bild"), eds[0].get("_pos")
+        if series_title:
+            ctitles = clean_edition_titles(eds, series_title)
+            book.name = sorted(ctitles, key=lambda x: len(x))[0]
+            series = found_series.setdefault(series_title, Series(name=series_title, autor_key=author.key))
+            series.books.append(book)
+        editions = []
+        for i in eds:
+            if i["key"] in sanity_dedub or i["key"] in in_db:
+                continue
+            editions.append(Edition(**i))
+            sanity_dedub.add(i["key"])
+        book.editions = editions
+        author.books.append(book)
+    session.add(author)
+    await session.flush()
+    await session.refresh(author, attribute_names=["series"])
+    await auto_union_series(author.series, session)
+    coros = [clean_series_duplicates(series, session) for series in author.series]
+    await asyncio.gather(*coros)
+    resp = author.key
+    await session.commit()
+    return resp
+
+def generate(editions: int = 5000, seed: int = 7) -> list[tuple[list[dict], str]]:
+    """scrape_book_groups-shaped work groups of one author."""
+    rnd = random.Random(seed)
+    series_names = [f"Reihe {w}" for w in ("Alpha", "Beta", "Gamma", "Delta", "Omega", "Sternenfahrer", "Nebel", "Zeit")]
+    series_names += ["Reihe Alpha -", "Sternenfahrer, Reihe"] # unioned with their counterparts
+    books = []
+    key = 0
+    while key < editions:
+        series_title = rnd.choice(series_names + [None] * 3)
+        pos = rnd.randint(1, 300)
+        title = f"Band {pos} Der {rnd.choice(['Weg', 'Turm', 'Fluss', 'Sturm'])}"
+        eds = []
+        for medium in rnd.sample([20, 42, 18, 1], rnd.randint(1, 4)):
+            titel = rnd.choice([title, f"{series_title} - {pos}" if series_title else title, title + "!"])
+            eds.append({"key": f"E{key}", "titel": titel, "bild": "b", "medium": medium, "_pos": pos if series_title else None, "verlag": "V"})
+            key += 1
+        books.append((eds, series_title))
+    return books
+
+async def save(directory: Path, add, books_data: list) -> dict:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{directory.as_posix()}/database.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        start = perf_counter()
+        async with AsyncSession(engine) as session:
+            await add(Author(key="A1", name="Bench"), session, books_data)
+        duration = perf_counter() - start
+    async with AsyncSession(engine) as session:
+        books = (await session.exec(select(Book))).all()
+        editions = (await session.exec(select(Edition))).all()
+        series = (await session.exec(select(Series))).all()
+    await engine.dispose()
+    series_names = {s.key: s.name for s in series}
+    book_rows = {b.key: (b.name, b.position, series_names.get(b.series_key)) for b in books}
+    return {
+        "duration": duration,
+        "graph": (sorted((book_rows[e.book_key], e.key) for e in editions if e.book_key in book_rows), sorted(series_names.values())),
+        "books": len(books), "editions": len(editions), "series": len(series),
+        "orphans": sum(e.book_key not in book_rows for e in editions),
+        "warnings": len(caught),
+    }
+
+async def run(editions: int, seed: int):
+    books_data = generate(editions, seed)
+    results = {}
+    for label, add in (("orm", add_books_to_author), ("bulk", bulk_add_books_to_author), ("orm, gather dedupe", legacy_add_books_to_author)):
+        with tempfile.TemporaryDirectory() as directory:
+            results[label] = await save(Path(directory), add, books_data)
+    assert results["orm"]["graph"] == results["bulk"]["graph"], "bulk insert saved a different graph than the ORM path"
+    assert not results["orm"]["orphans"] and not results["bulk"]["orphans"], "editions left without their book"
+    print(f"{editions} editions, seed {seed}: ORM and bulk graphs match")
+    for label, r in results.items():
+        print(f"{label + ':':<20} {r['duration']:.2f}s  books={r['books']} editions={r['editions']} series={r['series']} "
+              f"orphaned editions={r['orphans']} warnings={r['warnings']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the ORM and bulk insert paths for a large new author")
+    parser.add_argument("--editions", type=int, default=5000, help="editions of the synthetic author")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    asyncio.run(run(args.editions, args.seed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Golden-corpus check and microbenchmark for title cleaning.
+
+    python -m backend.bench_titles [--rounds 5] [--regenerate]
+
+Every entry of bench_data/titles.json holds a title, its series title and position, the
+can_be_empty flag and the output of the original per-call-regex clean_title. The script
+asserts that clean_title still produces exactly that output and then times it against the
+original implementation. --regenerate rebuilds the corpus from the seeded generator below.
+"""
+import argparse
+import json
+import random
+import re
+from pathlib import Path
+from time import perf_counter
+from backend.services.scrape import clean_title, fix_diaeresis, reconstruct_parentheses, _title_cleaner
+
+CORPUS = Path(__file__).parent / "bench_data" / "titles.json"
+
+
+def legacy_strip_non_word(text: str):
+    text = re.sub(r"^[\W]*", "", text, flags=re.UNICODE | re.M)
+    return re.sub(r"[\W]*$", "", text, flags=re.UNICODE | re.M)
+
+def legacy_clean_title(title: str, series_title: str = None, series_pos: int = None, can_be_empty: bool = False):
+    """clean_title as it was before TitleCleaner, kept verbatim as the reference."""
+    bak = title
+
+    title = fix_diaeresis(title)
+    if series_title:
+        title = re.sub(fr"\b(?:(?:der)|(?:die)|(?:das)|)\W*{re.escape(series_title)}\W", "", title, flags=re.UNICODE | re.I)
+    if series_title and title == bak:
+        title = re.sub(fr"\b(?:(?:der)|(?:die)|(?:das)|)\W*{re.escape(series_title.replace('-', ' '))}\W", "", title, flags=re.UNICODE | re.I)
+
+    try:
+        series_pos = int(float(series_pos))
+    except Exception:
+        series_pos = None
+    title = re.sub(r"\(.*kürz.*\)", "", title, re.I) # remove (gekürzte Lesung) and alike
+    title = legacy_strip_non_word(title)
+    title = re.sub(fr"^(?:(?:b(?:(?:an)|)d)|(?:teil)|(?:folge)|(?:buch)|)\W*0*{series_pos}", "", title, flags=re.UNICODE | re.I)# remove leading position
+    title = re.sub(fr"(?:(?:b(?:(?:an)|)d)|(?:teil)|(?:folge)|(?:buch)|)\W*0*{series_pos}$", "", title, flags=re.UNICODE | re.I)# remove traling position
+    #### Known patterns ####
+    title = title.replace(" - , Teil", "")
+    ########################
+    title = legacy_strip_non_word(title)
+    title = reconstruct_parentheses(title)
+    if can_be_empty:
+        return title
+    return title or bak.strip() # sanity check dont return empty string
+
+def generate(size: int = 3000, seed: int = 11) -> list[list]:
+    rnd = random.Random(seed)
+    series = ["Die drei ???", "Perry Rhodan Neo", "Skulduggery Pleasant", "Die Chroniken von Narnia", "Harry Potter",
+              "Das Lied von Eis und Feuer", "Maigret", "Eberhofer-Krimi", "Die Tribute von Panem", "Der Hexer",
+              "Kommissar Dupin", "Die Känguru-Chroniken", "Sherlock Holmes", "Warrior Cats", "Die Welle"]
+    words = ["Geheimnis", "Turm", "Schatten", "Feuer", "Fluch", "Nacht", "Insel", "Rückkehr", "Erbe", "Spiegel",
+             "Zeit", "König", "Sturm", "Wölfe", "Mörder", "Tod", "Stadt", "Meer", "Drache", "Spur"]
+    prefixes = ["", "Band ", "Bd. ", "Teil ", "Folge ", "Buch ", "Bd ", "Folge 0"]
+    suffixes = ["", " (gekürzte Lesung)", " (Ungekürzt)", " (ungekürzt)", " [Hörspiel]", " (Teil 1", " - , Teil", "!", " ..."]
+    corpus = []
+    for _ in range(size):
+        series_title = rnd.choice(series + [None, None])
+        pos = rnd.choice([rnd.randint(1, 250), rnd.randint(1, 250) + 0.5, None, "", "x"])
+        name = " ".join(rnd.sample(words, rnd.randint(1, 3)))
+        article = rnd.choice(["", "Der ", "Die ", "Das "])
+        if rnd.random() < 0.3:
+            name = name.replace("ä", "a¨").replace("ö", "o¨").replace("ü", "u¨")
+        shown = rnd.choice([pos, rnd.randint(1, 250)]) if pos not in (None, "", "x") else rnd.randint(1, 250)
+        shown = int(float(shown))
+        pattern = rnd.randrange(7)
+        if pattern == 0 and series_title:
+            title = f"{series_title} - {rnd.choice(prefixes)}{shown}: {article}{name}"
+        elif pattern == 1 and series_title:
+            title = f"{article}{name} ({series_title} {rnd.choice(prefixes)}{shown})"
+        elif pattern == 2 and series_title:
+            title = f"{series_title.replace(' ', '-')} {shown}"
+        elif pattern == 3:
+            title = f"{rnd.choice(prefixes)}{shown} - {article}{name}"
+        elif pattern == 4:
+            title = f"{article}{name}, {rnd.choice(prefixes)}{shown}"
+        elif pattern == 5 and series_title:
+            title = f"{series_title} {shown}"
+        else:
+            title = f"{article}{name}"
+        title += rnd.choice(suffixes)
+        can_be_empty = rnd.random() < 0.3
+        corpus.append([title, series_title, pos, can_be_empty, legacy_clean_title(title, series_title, pos, can_be_empty)])
+    return corpus
+
+def time_it(fn, corpus: list[list], rounds: int) -> float:
+    start = perf_counter()
+    for _ in range(rounds):
+        for title, series_title, pos, can_be_empty, _ in corpus:
+            fn(title, series_title, pos, can_be_empty)
+    return perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Check clean_title against the golden corpus and time it")
+    parser.add_argument("--rounds", type=int, default=5, help="passes over the corpus per implementation")
+    parser.add_argument("--regenerate", action="store_true", help="rebuild the golden corpus from the legacy implementation")
+    args = parser.parse_args()
+    if args.regenerate:
+        CORPUS.parent.mkdir(exist_ok=True)
+        CORPUS.write_text("[\n" + ",\n".join(json.dumps(entry, ensure_ascii=False) for entry in generate()) + "\n]\n", encoding="utf-8")
+    corpus = json.loads(CORPUS.read_text(encoding="utf-8"))
+
+    mismatches = [(entry, got) for entry in corpus if (got := clean_title(*entry[:4])) != entry[4]]
+    for (title, series_title, pos, can_be_empty, expected), got in mismatches[:10]:
+        print(f"MISMATCH {title!r} series={series_title!r} pos={pos!r} can_be_empty={can_be_empty}: expected {expected!r}, got {got!r}")
+    assert not mismatches, f"{len(mismatches)} of {len(corpus)} titles differ from the golden corpus"
+    assert all(legacy_clean_title(*entry[:4]) == entry[4] for entry in corpus), "golden corpus does not match the reference implementation"
+    print(f"{len(corpus)} titles match the golden corpus")
+
+    _title_cleaner.cache_clear() # include compiling the cleaners in the measurement
+    calls = len(corpus) * args.rounds
+    legacy = time_it(legacy_clean_title, corpus, args.rounds)
+    current = time_it(clean_title, corpus, args.rounds)
+    print(f"legacy clean_title: {legacy:.3f}s ({legacy / calls * 1e6:.1f} µs/title)")
+    print(f"clean_title:        {current:.3f}s ({current / calls * 1e6:.1f} µs/title)")
+    print(f"speedup: {legacy / current:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Import many authors at once without going through the web UI.
+
+    python -m backend.bulk_import authors.txt [--override]
+
+The list file holds one author id or name per line, `-` reads from stdin.
+Uses the same CONFIG_DIR, database and scrape cache as the server.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from contextlib import suppress
+from types import SimpleNamespace
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.config import ConfigManager
+from backend.db import init_db
+from backend.exceptions import BaseError
+from backend.dependencies import get_logger
+from backend.services.imports import bulk_import_authors
+from backend.services.request import reload_scraper, close_scraper
+from backend.services.scrape import scrape_progress
+
+
+async def run(entries: list[str], override: bool) -> dict:
+    cfg = ConfigManager(os.getenv("CONFIG_DIR", "/config"))
+    state = SimpleNamespace(cfg_manager=cfg)
+    state.engine = await init_db(cfg)
+    try:
+        await reload_scraper(state)
+    except BaseError as e:
+        get_logger().error(f"Failed to initialize scraper, falling back to cloudscraper. Further information: {e.detail}")
+        cfg.playwright = False
+        await reload_scraper(state)
+    scrape_progress.set({})
+    try:
+        async with AsyncSession(state.engine) as session:
+            return await bulk_import_authors(session, cfg, entries, override)
+    finally:
+        await close_scraper()
+        with suppress(Exception):
+            await state.browser.close()
+        with suppress(Exception):
+            await state.playwright.stop()
+        await state.engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import authors by id or name")
+    parser.add_argument("file", help="list file with one author id or name per line, - for stdin")
+    parser.add_argument("--override", action="store_true", help="replace authors that already exist")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    if args.file == "-":
+        entries = sys.stdin.read().splitlines()
+    else:
+        with open(args.file, encoding="utf-8") as f:
+            entries = f.read().splitlines()
+    report = asyncio.run(run(entries, args.override))
+    json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+    sys.exit(1 if report["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -77,6 +77,22 @@ class ConfigManager:
                 "value": 3600,
                 "input_type": "number"
             },
+            "refresh_interval": {
+                "value": 21600,
+                "input_type": "number"
+            },
+            "refresh_request_budget": {
+                "value": 300,
+                "input_type": "number"
+            },
+            "import_concurrency": {
+                "value": 2,
+                "input_type": "number"
+            },
+            "bulk_insert_threshold": {
+                "value": 1000,
+                "input_type": "number"
+            },
             "indexer_timeout": {
                 "value": 5,
                 "input_type": "number"
@@ -97,10 +113,71 @@ class ConfigManager:
                 "value": True,
                 "input_type": "checkbox"
             },
+            "playwright_request_context": {
+                "value": True,
+                "input_type": "checkbox"
+            },
+            "scrape_pool_size": {
+                "value": 4,
+                "input_type": "number"
+            },
+            "scrape_page_max_uses": {
+                "value": 50,
+                "input_type": "number"
+            },
+            "clearance_refresh_interval": {
+                "value": 1800,
+                "input_type": "number"
+            },
+            "scrape_concurrency": {
+                "value": 6,
+                "input_type": "number"
+            },
+            "scrape_rate": {
+                "value": 5,
+                "input_type": "number"
+            },
+            "scrape_retries": {
+                "value": 3,
+                "input_type": "number"
+            },
+            "scrape_mode": {
+                "value": "live",
+                "input_type": "select",
+                "options": [
+                    "live",
+                    "record",
+                    "replay",
+                ],
+            },
+            "replay_latency": {
+                "value": 0,
+                "input_type": "number"
+            },
+            "replay_error_rate": {
+                "value": 0,
+                "input_type": "number"
+            },
             "skip_cache": {
                 "value": False,
                 "input_type": "checkbox"
             },
+            "stale_while_revalidate": {
+                "value": False,
+                "input_type": "checkbox"
+            },
+            "cache_max_bytes": {
+                "value": 1024**3,
+                "input_type": "number"
+            },
+            "cache_max_entries": {
+                "value": 100000,
+                "input_type": "number"
+            },
+            "cache_sweep_interval": {
+                "value": 3600,
+                "input_type": "number"
+            },
             "known_bundles": {
                 "value": "Krimi Box,Krimi-Box,3er-Box",
                 "input_type": "text"
@@ -149,7 +226,8 @@ class ConfigManager:
         r = {
             k : {
                 "value": v["value"] if v["input_type"] != "password" else "*"*len(v["value"]),
-                "input_type": v["input_type"]
+                "input_type": v["input_type"],
+                **({"options": v["options"]} if "options" in v else {})
             } for k, v in self._data.items()
         }
         return r
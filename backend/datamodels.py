@@ -1,4 +1,5 @@
 from typing import Optional, List, Literal
+from sqlalchemy import JSON, Column
 from sqlmodel import SQLModel, Field, Relationship, case
 from time import time
 from enum import Enum
@@ -12,7 +13,7 @@ medium_priority = {20: 0, 42: 1, 18: 2, 1: 3}
 class Series(SQLModel, table=True):
     key: str = Field(primary_key=True, default_factory=lambda: id_generator("S"))
     name: str
-    autor_key: str = Field(foreign_key="author.key")
+    autor_key: str = Field(foreign_key="author.key", index=True)
     a_dl_loc: Optional[str] = None
     b_dl_loc: Optional[str] = None
 
@@ -21,7 +22,7 @@ class Series(SQLModel, table=True):
 
 class Edition(SQLModel, table=True):
     key: str = Field(primary_key=True)
-    book_key: str = Field(foreign_key="book.key")
+    book_key: str = Field(foreign_key="book.key", index=True)
     titel: str
     bild: str
     einband: Optional[str] = None
@@ -41,13 +42,13 @@ class Edition(SQLModel, table=True):
 class Book(SQLModel, table=True):
     key: str = Field(primary_key=True, default_factory=lambda: id_generator("B"))
     name: str
-    autor_key: str = Field(foreign_key="author.key")
+    autor_key: str = Field(foreign_key="author.key", index=True)
     bild: Optional[str] = None
-    series_key: Optional[str] = Field(default=None, foreign_key="series.key")
+    series_key: Optional[str] = Field(default=None, foreign_key="series.key", index=True)
     position: Optional[float] = None
     a_dl_loc: Optional[str] = None
     b_dl_loc: Optional[str] = None
-    blocked: bool = False
+    blocked: bool = Field(default=False, index=True)
     foreign: bool = False
 
     # Change in api.py lin 143
@@ -68,6 +69,17 @@ class Author(SQLModel, table=True):
 
     books: List["Book"] = Relationship(back_populates="author", sa_relationship_kwargs={"order_by": (Book.series_key, Book.position), "cascade": "all, delete-orphan"})
     series: List["Series"] = Relationship(back_populates="author", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
+    sync: Optional["AuthorSync"] = Relationship(back_populates="author", sa_relationship_kwargs={"cascade": "all, delete-orphan", "uselist": False})
+
+class AuthorSync(SQLModel, table=True):
+    autor_key: str = Field(primary_key=True, foreign_key="author.key")
+    pages: int = 0
+    items: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    synced: float = Field(default_factory=time)
+    interval: float = 7*24*3600
+    next_check: float = 0
+
+    author: "Author" = Relationship(back_populates="sync")
 
 class ActivityStatus(str, Enum):
     imported = "imported"
@@ -81,8 +93,8 @@ class Activity(SQLModel, table=True):
     nzo_id: str = Field(primary_key=True, default_factory=lambda: id_generator("A"))
     created: float = Field(default_factory=time)
     release_title: str
-    book_key: str = Field(foreign_key="book.key")
-    status: ActivityStatus = ActivityStatus.download
+    book_key: str = Field(foreign_key="book.key", index=True)
+    status: ActivityStatus = Field(default=ActivityStatus.download, index=True)
     audio: bool
     guid: Optional[str] = None
 
@@ -2,12 +2,42 @@ from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import SQLModel
 
 from backend.config import ConfigManager
+from backend.dependencies import get_logger
 
 
+def add_foreign_key_indexes(conn):
+    for table, column in (("book", "autor_key"), ("book", "series_key"), ("book", "blocked"), ("edition", "book_key"),
+                          ("activity", "book_key"), ("activity", "status"), ("series", "autor_key")):
+        conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS ix_{table}_{column} ON {table} ({column})")
+
+def add_author_refresh_columns(conn):
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(authorsync)")}
+    if "interval" not in columns:
+        conn.exec_driver_sql(f"ALTER TABLE authorsync ADD COLUMN interval FLOAT NOT NULL DEFAULT {7*24*3600}")
+    if "next_check" not in columns:
+        conn.exec_driver_sql("ALTER TABLE authorsync ADD COLUMN next_check FLOAT NOT NULL DEFAULT 0")
+        # authors synced before keep their schedule, instead of all being due on the first refresh
+        conn.exec_driver_sql("UPDATE authorsync SET next_check = synced + interval")
+
+# Applied in order to databases created before they existed, PRAGMA user_version counts the applied ones.
+# Only ever append, and keep each migration safe to run on a database create_all just made.
+MIGRATIONS = [
+    add_foreign_key_indexes,
+    add_author_refresh_columns,
+]
+
+def migrate(conn):
+    version = conn.exec_driver_sql("PRAGMA user_version").scalar()
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        get_logger().info(f"Migrating database to version {number}: {migration.__name__}")
+        migration(conn)
+        conn.exec_driver_sql(f"PRAGMA user_version = {number}")
+
 async def init_db(cfg: ConfigManager):
     DATABASE_URL = f"sqlite+aiosqlite:///{cfg.config_dir.as_posix()}/database.db"
     engine = create_async_engine(DATABASE_URL)
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(migrate)
 
-    return engine
\ No newline at end of file
+    return engine
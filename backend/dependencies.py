@@ -18,16 +18,17 @@ def get_logger() -> logging.Logger:
 def get_error_logger() -> logging.Logger:
     return logging.getLogger('uraniarr.err')
 
+def prepare_name(s: str) -> str:
+    s = s.lower()
+    s = re.sub(r"[-–—]", " ", s)       # replace dashes with spaces
+    s = re.sub(r"[.:;,_!?()\"']", " ", s)  # remove or space punctuation
+    s = re.sub(r"\s+", " ", s).strip() # collapse multiple spaces
+    return s
+
 def get_scorer():
-    def prepare(s: str) -> str:
-        s = s.lower()
-        s = re.sub(r"[-–—]", " ", s)       # replace dashes with spaces
-        s = re.sub(r"[.:;,_!?()\"']", " ", s)  # remove or space punctuation
-        s = re.sub(r"\s+", " ", s).strip() # collapse multiple spaces
-        return s
     def smart_ratio(query: str, choice: str,  *args, **kwargs):
-        q=prepare(query)
-        c=prepare(choice)
+        q=prepare_name(query)
+        c=prepare_name(choice)
         if len(query) < 3 or len(choice) < 3:
             return fuzz.ratio(q, c, *args, **kwargs)
         return fuzz.token_set_ratio(q, c, *args, **kwargs)
@@ -13,7 +13,8 @@ from backend.routers import dapi, tapi, api
 from backend.exceptions import BaseError
 from backend.config import ConfigManager
 from backend.services.jobs import init_jobs, stop_jobs
-from backend.services.request import reload_scraper
+from backend.services.request import reload_scraper, close_scraper
+from backend.services.imports import stop_imports
 from backend.services.indexer import *
 from backend.services.downloader import *
 from backend.dependencies import get_error_logger, get_logger
@@ -52,6 +53,8 @@ async def lifespan(app: FastAPI):
     finally:
         try:
             await stop_jobs(app.state)
+            await stop_imports()
+            await close_scraper()
             with suppress(Exception):
                 await app.state.browser.close()
             with suppress(Exception):
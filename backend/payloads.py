@@ -4,6 +4,10 @@ class SeriesAuthor(BaseModel):
     name: str
     entry_id: str
 
+class BulkAuthors(BaseModel):
+    entries: list[str]
+    override: bool = False
+
 class UnionSeries(BaseModel):
     series_id: str
     series_ids: list[str]
@@ -9,9 +9,10 @@ from backend.datamodels import *
 from backend.payloads import *
 from backend.config import ConfigManager
 from backend.services.jobs import get_job_by_interval, restart_job
-from backend.services.scrape import scrape_all_author_data, scrape_book_series, clean_title
+from backend.services.scrape import clean_title
 from backend.services.request import reload_scraper
-from backend.services.author_service import save_author_to_db, complete_series_in_db, add_books_to_author, make_author_from_series, union_series
+from backend.services.author_service import import_author, complete_author, import_series_author, complete_series, union_series
+from backend.services.imports import submit_import, get_import, list_imports, cancel_import, bulk_import_authors, bulk_target
 from backend.services.filehelper import delete_audio_series, delete_audio_book, delete_audio_author, ensure_backup, get_files_of_book, preview_retag, retag_book
 from backend.services.indexer import *
 from backend.services.downloader import *
@@ -103,39 +104,44 @@ async def get_settings(cfg: ConfigManager = Depends(get_cfg_manager)):
     return cfg.get()
 
 @router.post("/author/{author_id}")
-async def add_author(author_id: str, session: AsyncSession = Depends(get_session), cfg: ConfigManager = Depends(get_cfg_manager), override: bool = False, name: str = ""):
-    data = await scrape_all_author_data(author_id, cfg, name)
-    resp = await save_author_to_db(author_id, session, data, override)
-    return resp
+async def add_author(author_id: str, request: Request, session: AsyncSession = Depends(get_session), cfg: ConfigManager = Depends(get_cfg_manager), override: bool = False, name: str = "", background: bool = False):
+    if background:
+        return submit_import(request.app.state, "author", author_id, lambda s: import_author(author_id, s, cfg, override, name)).to_dict()
+    return await import_author(author_id, session, cfg, override, name)
+
+@router.post("/authors/bulk")
+async def add_authors_bulk(bulk: BulkAuthors, request: Request, cfg: ConfigManager = Depends(get_cfg_manager)):
+    return submit_import(request.app.state, "bulk", bulk_target(bulk.entries, bulk.override), lambda s: bulk_import_authors(s, cfg, bulk.entries, bulk.override), slot=False).to_dict()
 
 @router.post("/author/complete/{author_id}")
-async def complete_author(author_id: str, session: AsyncSession = Depends(get_session), cfg: ConfigManager = Depends(get_cfg_manager)):
-    author = await session.get(Author, author_id, options=[selectinload(Author.series).selectinload(Series.books).selectinload(Book.editions), selectinload(Author.books).selectinload(Book.editions)])
-    if not author:
-        raise HTTPException(status_code=404, detail="Author not found")
-    if author.is_series:
-        ed_id = min(author.series[0].books, key=lambda b: (b.position or 999)).editions[0].key
-        data = await scrape_book_series(ed_id, cfg)
-        resp = await complete_series_in_db(author.series[0].key, session, data)
-        return resp
-    data = await scrape_all_author_data(author.key, cfg, author.name)
-    resp = await add_books_to_author(author, session, data["books"])
-    return resp
+async def complete_author_books(author_id: str, request: Request, session: AsyncSession = Depends(get_session), cfg: ConfigManager = Depends(get_cfg_manager), delta: bool = False, background: bool = False):
+    if background:
+        return submit_import(request.app.state, "complete_author", author_id, lambda s: complete_author(author_id, s, cfg, delta)).to_dict()
+    return await complete_author(author_id, session, cfg, delta)
 
 @router.post("/fakeauthor")
-async def fake_author(seriesAuthor: SeriesAuthor, session: AsyncSession = Depends(get_session), cfg: ConfigManager = Depends(get_cfg_manager)):
-    data = await scrape_book_series(seriesAuthor.entry_id, cfg)
-    resp = await make_author_from_series(seriesAuthor.name, session, data)
-    return resp
+async def fake_author(seriesAuthor: SeriesAuthor, request: Request, session: AsyncSession = Depends(get_session), cfg: ConfigManager = Depends(get_cfg_manager), background: bool = False):
+    if background:
+        return submit_import(request.app.state, "series_author", seriesAuthor.entry_id, lambda s: import_series_author(seriesAuthor.name, seriesAuthor.entry_id, s, cfg)).to_dict()
+    return await import_series_author(seriesAuthor.name, seriesAuthor.entry_id, session, cfg)
 
 @router.post("/series/complete/{series_id}")
-async def complete_series_of_author(series_id: str, session: AsyncSession = Depends(get_session), cfg: ConfigManager = Depends(get_cfg_manager)):
-    series = await session.get(Series, series_id, options=[selectinload(Series.books).selectinload(Book.editions)])
-    if not series: raise HTTPException(status_code=404, detail="Series not found")
-    ed_id = min(series.books, key=lambda b: (b.position or 999)).editions[0].key
-    data = await scrape_book_series(ed_id, cfg)
-    resp = await complete_series_in_db(series_id, session, data)
-    return resp
+async def complete_series_of_author(series_id: str, request: Request, session: AsyncSession = Depends(get_session), cfg: ConfigManager = Depends(get_cfg_manager), background: bool = False):
+    if background:
+        return submit_import(request.app.state, "complete_series", series_id, lambda s: complete_series(series_id, s, cfg)).to_dict()
+    return await complete_series(series_id, session, cfg)
+
+@router.get("/imports")
+async def get_imports():
+    return [job.to_dict() for job in list_imports()]
+
+@router.get("/imports/{job_id}")
+async def get_import_status(job_id: str):
+    return get_import(job_id).to_dict()
+
+@router.delete("/imports/{job_id}")
+async def cancel_import_job(job_id: str):
+    return cancel_import(job_id).to_dict()
 
 @router.post("/series/cleanup/{series_id}")
 async def cleanup_series(series_id: str, name: str, session: AsyncSession = Depends(get_session)):
@@ -239,7 +245,7 @@ async def update_settings(settings: dict[str, Any], request: Request):
     cfg = state.cfg_manager
     for key in settings:
         setattr(cfg, key, settings[key])
-        if key == "playwright":
+        if key in ("playwright", "scrape_pool_size", "scrape_page_max_uses"):
             await reload_scraper(state)
         elif key == "indexer_prowlarr":
             state.indexer = ProwlarrService() if settings[key] else NewznabService()
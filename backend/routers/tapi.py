@@ -1,14 +1,19 @@
+import json
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from backend.datamodels import Edition
+from backend.exceptions import BaseError
 from backend.dependencies import get_cfg_manager
 from backend.services.scrape import (
     scrape_book_editions,
     scrape_author_data,
     scrape_search,
+    scrape_search_stream,
 )
+from backend.services.request import scrape_stats, use_interactive_lane
 
 
-router = APIRouter(prefix="/tapi", tags=["scraped"])
+router = APIRouter(prefix="/tapi", tags=["scraped"], dependencies=[Depends(use_interactive_lane)])
 
 @router.get("/books/editions/{book_id}")
 async def fetch_book_editions(book_id: str, cfg = Depends(get_cfg_manager)):
@@ -24,6 +29,20 @@ async def fetch_author_data(author_id: str, cfg = Depends(get_cfg_manager)):
     return data
 
 @router.get("/search")
-async def search(q: str, cfg = Depends(get_cfg_manager)):
-    data = await scrape_search(q, cfg)
+async def search(q: str, page: int = 1, cfg = Depends(get_cfg_manager)):
+    data = await scrape_search(q, cfg, page)
     return data
+
+@router.get("/search/stream")
+async def search_stream(q: str, page: int = 1, prefetch: bool = False, cfg = Depends(get_cfg_manager)):
+    async def events():
+        try:
+            async for event, data in scrape_search_stream(q, cfg, page, prefetch):
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        except BaseError as e: # headers are already sent, report it in the stream
+            yield f"event: error\ndata: {json.dumps({'detail': e.detail, 'type': e.type})}\n\n"
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.get("/stats")
+async def get_scrape_stats():
+    return scrape_stats()
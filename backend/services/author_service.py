@@ -1,15 +1,67 @@
 import asyncio
-from itertools import combinations
+from time import time
 from rapidfuzz import fuzz
-from sqlmodel import select
+from sqlmodel import insert, select
 from sqlalchemy.orm import selectinload
 from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.datamodels import *
-from backend.dependencies import get_logger, get_scorer
+from backend.config import ConfigManager
+from backend.dependencies import get_error_logger, get_logger
 from backend.exceptions import AuthorError
-from backend.services.scrape import clean_title
+from backend.services.request import RequestBudget, request_budget, wait_for_scraper
+from backend.services.edition_service import existing_edition_keys
+from backend.services.similarity import cluster_names, find_duplicates
+from backend.services.scrape import clean_title, clean_edition_titles, scrape_all_author_data, scrape_author_delta, scrape_book_series, track
 
-async def save_author_to_db(author_id: str, session: AsyncSession, scraped: dict, override: bool = False):
+REFRESH_MIN_INTERVAL = 24*3600
+REFRESH_MAX_INTERVAL = 30*24*3600
+BULK_INSERT_CHUNK = 500
+
+async def import_author(author_id: str, session: AsyncSession, cfg: ConfigManager, override: bool = False, name: str = ""):
+    data = await scrape_all_author_data(author_id, cfg, name)
+    track("db", total=1)
+    resp = await save_author_to_db(author_id, session, data, override, cfg.bulk_insert_threshold or 0)
+    await save_author_sync(author_id, session, data["author_data"]["_pages"], data["author_data"]["_books"])
+    track("db", done=1)
+    return resp
+
+async def complete_author(author_id: str, session: AsyncSession, cfg: ConfigManager, delta: bool = False):
+    author = await session.get(Author, author_id, options=[selectinload(Author.series).selectinload(Series.books).selectinload(Book.editions), selectinload(Author.books).selectinload(Book.editions), selectinload(Author.sync)])
+    if not author:
+        raise AuthorError(status_code=404, detail="Author not found")
+    if author.is_series:
+        return await complete_series(author.series[0].key, session, cfg)
+    if delta and author.sync:
+        data = await scrape_author_delta(cfg, author.name, author.sync.pages, set(author.sync.items))
+        pages, items = data["pages"], data["items"]
+    else:
+        data = await scrape_all_author_data(author.key, cfg, author.name)
+        pages, items = data["author_data"]["_pages"], data["author_data"]["_books"]
+    track("db", total=1)
+    resp = await add_books_to_author(author, session, data["books"])
+    await save_author_sync(author_id, session, pages, items)
+    track("db", done=1)
+    return resp
+
+async def import_series_author(name: str, entry_id: str, session: AsyncSession, cfg: ConfigManager):
+    data = await scrape_book_series(entry_id, cfg)
+    track("db", total=1)
+    resp = await make_author_from_series(name, session, data)
+    track("db", done=1)
+    return resp
+
+async def complete_series(series_id: str, session: AsyncSession, cfg: ConfigManager):
+    series = await session.get(Series, series_id, options=[selectinload(Series.books).selectinload(Book.editions)])
+    if not series:
+        raise AuthorError(status_code=404, detail="Series not found")
+    ed_id = min(series.books, key=lambda b: (b.position or 999)).editions[0].key
+    data = await scrape_book_series(ed_id, cfg)
+    track("db", total=1)
+    resp = await complete_series_in_db(series_id, session, data)
+    track("db", done=1)
+    return resp
+
+async def save_author_to_db(author_id: str, session: AsyncSession, scraped: dict, override: bool = False, bulk_threshold: int = 0):
     author_data = scraped["author_data"]
     books_data = scraped["books"]
     if author := await session.get(Author, author_id):
@@ -17,14 +69,15 @@ async def save_author_to_db(author_id: str, session: AsyncSession, scraped: dict
             raise AuthorError(detail=f"Author {author_id} already exists", status_code=403)
         else: await session.delete(author)
     author = Author(**author_data)
+    if bulk_threshold and sum(len(eds) for eds, _ in books_data) >= bulk_threshold:
+        return await bulk_add_books_to_author(author, session, books_data)
     resp = await add_books_to_author(author, session, books_data)
     return resp
 
 async def add_books_to_author(author: Author, session: AsyncSession, books_data: list):
     found_series: dict[str, Series] = {}
     sanity_dedub = set() # see A1040945738 for funky shit
-    result = await session.exec(select(Edition.key))
-    in_db = set(result.all())
+    in_db = await existing_edition_keys(session, (ed["key"] for eds, _ in books_data for ed in eds))
     for eds, series_title in books_data:
         if not eds:
             get_logger().debug(f"Skipping book because it has no editions")
@@ -36,7 +89,7 @@ async def add_books_to_author(author: Author, session: AsyncSession, books_data:
         book = Book(autor_key=author.key)
         book.name, book.bild, book.position = clean_title(eds[0].get("titel")), eds[0].get("bild"), eds[0].get("_pos")
         if series_title:
-            ctitles = [clean_title(ed.get("titel"), series_title, ed.get("_pos")) for ed in eds]
+            ctitles = clean_edition_titles(eds, series_title)
             book.name = sorted(ctitles, key=lambda x: len(x))[0]
             series = found_series.setdefault(series_title, Series(name=series_title, autor_key=author.key))
             series.books.append(book)
@@ -55,44 +108,194 @@ async def add_books_to_author(author: Author, session: AsyncSession, books_data:
     await session.flush()
     await session.refresh(author, attribute_names=["series"])
     await auto_union_series(author.series, session)
-    coros = [clean_series_duplicates(series, session) for series in author.series]
-    await asyncio.gather(*coros)
+    for series in author.series:
+        await clean_series_duplicates(series, session)
     resp = author.key
     await session.commit()
     return resp
 
+def plan_author_books(author_key: str, books_data: list, in_db: set[str]) -> tuple[list[dict], list[dict], list[dict]]:
+    """
+    Series, book and edition rows that add_books_to_author ends up with for a new author,
+    series unions and duplicate merges included, computed without the ORM.
+    """
+    found_series: dict[str, dict] = {}
+    books: list[dict] = []
+    editions: dict[str, list[dict]] = {}
+    sanity_dedub = set()
+    for eds, series_title in books_data:
+        if not eds:
+            continue
+        eds = sorted(eds, key=lambda x: medium_priority.get(x["medium"], 10))
+        if any(ed["key"] in in_db for ed in eds):
+            continue
+        book = {"key": id_generator("B"), "autor_key": author_key, "name": clean_title(eds[0].get("titel")),
+                "bild": eds[0].get("bild"), "position": eds[0].get("_pos"), "series_key": None}
+        if series_title:
+            book["name"] = sorted(clean_edition_titles(eds, series_title), key=lambda x: len(x))[0]
+            book["series_key"] = found_series.setdefault(series_title, {"key": id_generator("S"), "name": series_title, "autor_key": author_key})["key"]
+        editions[book["key"]] = []
+        for ed in eds:
+            if ed["key"] in sanity_dedub:
+                continue
+            editions[book["key"]].append(ed)
+            sanity_dedub.add(ed["key"])
+        books.append(book)
+    series = list(found_series.values())
+    members = {s["key"]: [b for b in books if b["series_key"] == s["key"]] for s in series}
+    for cluster in cluster_names([s["name"] for s in series]):
+        if len(cluster) < 2: continue
+        target = min((series[i] for i in cluster), key=lambda s: len(s["name"]))
+        for i in cluster:
+            if series[i] is target: continue
+            for book in members.pop(series[i]["key"]):
+                book["name"] = clean_title(book["name"], target["name"], book["position"])
+                book["series_key"] = target["key"]
+                members[target["key"]].append(book)
+    series = [s for s in series if s["key"] in members]
+    dropped = set()
+    for s in series:
+        in_series = members[s["key"]]
+        for keep, drop in find_duplicates([(b["name"], b["position"]) for b in in_series], s["name"]):
+            editions[in_series[keep]["key"]].extend(editions.pop(in_series[drop]["key"]))
+            dropped.add(in_series[drop]["key"])
+    books = [Book(**b).model_dump() for b in books if b["key"] not in dropped]
+    edition_rows = [Edition(**ed, book_key=book_key).model_dump() for book_key, eds in editions.items() for ed in eds]
+    return [Series(**s).model_dump() for s in series], books, edition_rows
+
+async def bulk_add_books_to_author(author: Author, session: AsyncSession, books_data: list):
+    """add_books_to_author for large new authors: plan everything in memory, then write it with batched INSERTs in one transaction."""
+    in_db = await existing_edition_keys(session, (ed["key"] for eds, _ in books_data for ed in eds))
+    series, books, editions = await asyncio.to_thread(plan_author_books, author.key, books_data, in_db)
+    await session.flush() # an overridden author has to be gone first
+    await session.exec(insert(Author), params=[author.model_dump()])
+    for model, rows in ((Series, series), (Book, books), (Edition, editions)):
+        for i in range(0, len(rows), BULK_INSERT_CHUNK):
+            await session.exec(insert(model), params=rows[i:i+BULK_INSERT_CHUNK])
+    await session.commit()
+    get_logger().debug(f"Bulk inserted {len(series)} series, {len(books)} books and {len(editions)} editions for {author.key}")
+    return author.key
+
+async def save_author_sync(author_key: str, session: AsyncSession, pages: int, items: set[str], found: bool = None):
+    """
+    Remember the listing size of an author, so the next completion can run as a delta.
+    `found` adapts the refresh interval: authors with new releases get checked more often.
+    """
+    sync = await session.get(AuthorSync, author_key)
+    if not sync:
+        sync = AuthorSync(autor_key=author_key)
+        session.add(sync)
+    sync.pages = pages
+    sync.items = sorted(items)
+    sync.synced = time()
+    if found is not None:
+        sync.interval = max(REFRESH_MIN_INTERVAL, sync.interval / 2) if found else min(REFRESH_MAX_INTERVAL, sync.interval * 1.5)
+    sync.next_check = sync.synced + sync.interval
+    await session.commit()
+
+async def refresh_author(author_key: str, session: AsyncSession, cfg: ConfigManager) -> int:
+    """Look for new releases of an author or series pseudo-author, returns the number of new listing items."""
+    author = await session.get(Author, author_key, options=[
+        selectinload(Author.series).selectinload(Series.books).selectinload(Book.editions),
+        selectinload(Author.books).selectinload(Book.editions),
+        selectinload(Author.sync),
+    ])
+    if not author:
+        return 0
+    known = set(author.sync.items) if author.sync else None
+    if author.is_series:
+        if not author.series or not (books := [b for b in author.series[0].books if b.editions]):
+            return 0
+        ed_id = min(books, key=lambda b: (b.position or 999)).editions[0].key
+        scraped = await scrape_book_series(ed_id, cfg, max_age=0)
+        if known is None:
+            known = {ed.key for b in author.series[0].books for ed in b.editions}
+        listed = {b["key"] for b in scraped}
+        new = listed - known
+        if new:
+            await complete_series_in_db(author.series[0].key, session, scraped)
+        await save_author_sync(author_key, session, 0, known | listed, found=bool(new))
+        return len(new)
+    if author.sync:
+        data = await scrape_author_delta(cfg, author.name, author.sync.pages, known)
+        new = len(data["items"] - known)
+        if data["books"]:
+            await add_books_to_author(author, session, data["books"])
+        await save_author_sync(author_key, session, data["pages"], data["items"], found=new > 0)
+        return new
+    data = await scrape_all_author_data(author.key, cfg, author.name)
+    await add_books_to_author(author, session, data["books"])
+    await save_author_sync(author_key, session, data["author_data"]["_pages"], data["author_data"]["_books"])
+    return 0
+
+async def refresh_library(state):
+    """Refresh all authors that are due, spread over the job interval and capped by a vendor request budget."""
+    cfg = state.cfg_manager
+    await wait_for_scraper()
+    now = time()
+    async with AsyncSession(state.engine) as session:
+        result = await session.exec(select(Author.key, AuthorSync.next_check).outerjoin(AuthorSync, AuthorSync.autor_key == Author.key))
+        due = sorted((next_check or 0, key) for key, next_check in result.all() if (next_check or 0) <= now)
+    if not due:
+        return
+    budget = RequestBudget(cfg.refresh_request_budget or 0)
+    token = request_budget.set(budget) # every vendor request started below, however deep, is charged to this run
+    spacing = cfg.refresh_interval / 2 / len(due)
+    refreshed = 0
+    left = 0
+    found = 0
+    try:
+        for idx, (_, author_key) in enumerate(due):
+            if not budget.left:
+                left = len(due) - idx
+                break
+            if idx:
+                await asyncio.sleep(spacing)
+            try:
+                async with AsyncSession(state.engine) as session:
+                    found += await refresh_author(author_key, session, cfg)
+                refreshed += 1
+            except Exception as e:
+                if not budget.left: # stopped mid author, it stays due and its cached pages carry over
+                    left = len(due) - idx
+                    break
+                get_error_logger().exception(e)
+                get_logger().error(f"Refreshing author {author_key} failed: {e}")
+    finally:
+        request_budget.reset(token)
+    if left:
+        get_logger().info(f"Refresh budget of {budget.limit} vendor requests used, {left} authors left for the next run")
+    get_logger().info(f"Refreshed {refreshed} authors with {budget.used} vendor requests, found {found} new releases")
+
 async def auto_union_series(series: list[Series], session: AsyncSession):
-    for r1, r2 in combinations(series, 2):
-        if get_scorer()(r1.name, r2.name) > 80:
-            if len(r1.name) > len(r2.name): r1, r2 = r2, r1
-            for book in r2.books:
-                book.name = clean_title(book.name, r1.name, book.position)
-            r1.books.extend(r2.books)
-            await session.delete(r2)
+    for cluster in cluster_names([s.name for s in series]):
+        if len(cluster) < 2: continue
+        members = [series[i] for i in cluster]
+        target = min(members, key=lambda s: len(s.name))
+        for other in members:
+            if other is target: continue
+            for book in other.books:
+                book.name = clean_title(book.name, target.name, book.position)
+            target.books.extend(other.books)
+            await session.delete(other)
 
 async def clean_series_duplicates(series: Series, session: AsyncSession):
-    for book, book2 in combinations(series.books, 2):
-        if not book.position or not book2.position: continue
-        if float(book.position) == float(book2.position) and (
-            (_b1:=clean_title(book.name, series.name, book.position, can_be_empty=True)=="") or # one of our books is just Series Name - Series Position like "Skulduggery Pleasant - 17"
-            (_b2:=clean_title(book2.name, series.name, book2.position, can_be_empty=True)=="") or
-            get_scorer()(book.name, book2.name) > 80): # we basically have the same book twice
-            if _b1:
-                book, book2 = book2, book
-            elif not _b2:
-                book, book2 = (book, book2) if len(book.name) < len(book2.name) else (book2, book)
-            book.editions.extend(book2.editions)
-            await session.delete(book2)
+    books = series.books
+    for keep, drop in find_duplicates([(b.name, b.position) for b in books], series.name):
+        books[keep].editions.extend(books[drop].editions)
+        await session.delete(books[drop])
 
 async def complete_series_in_db(series_id: str, session: AsyncSession, scraped: dict):
     series = await session.get(Series, series_id)
     if not series:
         raise AuthorError(status_code=404, detail="Series not found")
+    in_db = await existing_edition_keys(session, (b.get("key") for b in scraped))
     for book_data in scraped:
-        if await session.get(Edition, book_data.get("key")): continue
+        if book_data.get("key") in in_db: continue
         book = Book(autor_key=series.autor_key, name=book_data.get("titel"), bild=book_data.get("bild"), position=book_data.get("_pos"))
         book.editions.append(Edition(**book_data))
         series.books.append(book)
+        in_db.add(book_data.get("key"))
     await session.commit()
     resp = [b["key"] for b in scraped]
     return resp
@@ -100,8 +303,7 @@ async def complete_series_in_db(series_id: str, session: AsyncSession, scraped:
 async def make_author_from_series(name:str, session: AsyncSession, scraped: dict):
     author = Author(key=id_generator(), name=name, is_series=True)
     series = Series(name=name)
-    result = await session.exec(select(Edition.key))
-    in_db = set(result.all())
+    in_db = await existing_edition_keys(session, (b.get("key") for b in scraped))
     for book_data in scraped:
         if book_data.get("key") in in_db:
             raise AuthorError(status_code=409, detail="Book already exists for diffrent author")
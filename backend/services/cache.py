@@ -0,0 +1,170 @@
+import asyncio
+import sqlite3
+import threading
+from pathlib import Path
+from pickle import load
+from time import time
+from typing import Optional
+from urllib.parse import urlencode
+from backend.dependencies import get_error_logger, get_logger
+
+
+def make_key(url: str, params: dict = None) -> str:
+    return f"{url}?{urlencode(sorted(params.items()))}" if params else url
+
+def entry_size(data) -> int:
+    return len(data.encode()) if isinstance(data, str) else len(data)
+
+
+class ScrapeCache:
+    """
+    SQLite-backed store for raw vendor responses, one row per (url, params) key.
+    Entries are read lazily and written one at a time, so neither startup nor a
+    cache miss scales with the size of the cache.
+    """
+
+    def __init__(self, path: Path, legacy: Optional[Path] = None):
+        self.path = path
+        self.legacy = legacy
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._count = 0
+        self._bytes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                conn.execute("VACUUM") # auto_vacuum only takes effect after a rebuild
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, time REAL NOT NULL, data BLOB NOT NULL)")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+            if "size" not in columns:
+                conn.execute("ALTER TABLE entries ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+                conn.execute("UPDATE entries SET size = length(CAST(data AS BLOB))")
+            if "accessed" not in columns:
+                conn.execute("ALTER TABLE entries ADD COLUMN accessed REAL NOT NULL DEFAULT 0")
+                conn.execute("UPDATE entries SET accessed = time")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_accessed ON entries (accessed)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_time ON entries (time)")
+            self._conn = conn
+            self._migrate_legacy()
+            self._count, self._bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return self._conn
+
+    def _migrate_legacy(self):
+        """One-time import of the old whole-file pickle cache."""
+        if not self.legacy or not self.legacy.is_file():
+            return
+        get_logger().info(f"Migrating scrape cache from {self.legacy} to {self.path}")
+        try:
+            with self.legacy.open("rb") as f:
+                old = load(f)
+            rows = ((make_key(url, dict(params)), v["time"], v["data"], entry_size(v["data"]), v["time"]) for (url, params), v in old.items())
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO entries (key, time, data, size, accessed) VALUES (?, ?, ?, ?, ?)", rows)
+            del old
+            self.legacy.unlink()
+            get_logger().info("Scrape cache migration finished")
+        except Exception as e:
+            get_logger().error(f"Failed to migrate scrape cache: {e}")
+            get_error_logger().exception(e)
+
+    def _get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT time, data FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time(), key))
+        return {"time": row[0], "data": row[1]}
+
+    def _stamp(self, key: str) -> Optional[float]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT time FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time(), key))
+        return row[0]
+
+    def _set(self, key: str, data, now: float, max_bytes: int = 0, max_entries: int = 0):
+        size = entry_size(data)
+        with self._lock:
+            conn = self._connect()
+            old = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            conn.execute("INSERT OR REPLACE INTO entries (key, time, data, size, accessed) VALUES (?, ?, ?, ?, ?)", (key, now, data, size, now))
+            if old is None:
+                self._count += 1
+            self._bytes += size - (old[0] if old else 0)
+            self._evict(conn, key, max_bytes, max_entries)
+
+    def _evict(self, conn: sqlite3.Connection, keep: str, max_bytes: int, max_entries: int):
+        """Drop least recently used entries until the cache fits its budget again."""
+        def over():
+            return (max_entries > 0 and self._count > max_entries) or (max_bytes > 0 and self._bytes > max_bytes)
+        evicted = 0
+        while over():
+            rows = conn.execute("SELECT key, size FROM entries WHERE key != ? ORDER BY accessed LIMIT 64", (keep,)).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if not over():
+                    break
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._count -= 1
+                self._bytes -= size
+                evicted += 1
+        if evicted:
+            get_logger().log(5, f"Evicted {evicted} scrape cache entries ({self._count} entries, {self._bytes} bytes left)")
+
+    def _delete(self, key: str):
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._count -= 1
+            self._bytes -= row[0]
+
+    def _expire(self, ttl: float) -> int:
+        with self._lock:
+            conn = self._connect()
+            cutoff = time() - ttl
+            count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE time < ?", (cutoff,)).fetchone()
+            conn.execute("DELETE FROM entries WHERE time < ?", (cutoff,))
+            self._count -= count
+            self._bytes -= size
+            conn.execute("PRAGMA incremental_vacuum")
+        return count
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._connect()
+            return {"entries": self._count, "bytes": self._bytes}
+
+    async def get(self, key: str) -> Optional[dict]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def stamp(self, key: str) -> Optional[float]:
+        """Fetch time of an entry without reading its data."""
+        return await asyncio.to_thread(self._stamp, key)
+
+    async def set(self, key: str, data, now: float, max_bytes: int = 0, max_entries: int = 0):
+        await asyncio.to_thread(self._set, key, data, now, max_bytes, max_entries)
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self._delete, key)
+
+    async def expire(self, ttl: float) -> int:
+        return await asyncio.to_thread(self._expire, ttl)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,15 @@
+from typing import Iterable
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.datamodels import Edition
+
+LOOKUP_CHUNK = 500 # stays well below SQLite's bound parameter limit
+
+async def existing_edition_keys(session: AsyncSession, keys: Iterable[str]) -> set[str]:
+    """Those of keys that already have an Edition row, looked up in chunks so cost follows the import size."""
+    keys = list({k for k in keys if k})
+    found = set()
+    for i in range(0, len(keys), LOOKUP_CHUNK):
+        result = await session.exec(select(Edition.key).where(Edition.key.in_(keys[i:i+LOOKUP_CHUNK])))
+        found.update(result.all())
+    return found
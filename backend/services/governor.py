@@ -0,0 +1,119 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from time import monotonic
+from backend.dependencies import get_logger
+
+
+LANES = ("interactive", "background") # highest priority first
+
+class RateGovernor:
+    """
+    Central gate for vendor requests: caps the number of concurrent requests,
+    spaces them with a token bucket and slows down when the vendor pushes back.
+    Free slots go to the highest priority lane first.
+    Limits are read from the config on every acquire, so settings apply live.
+    """
+
+    MIN_FACTOR = 0.1
+
+    def __init__(self):
+        self.active = 0
+        self.limit = 1
+        self._waiters: dict[str, deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self._lane_stats = {lane: {"served": 0, "wait_total": 0.0, "wait_max": 0.0} for lane in LANES}
+        self._tokens = 1.0
+        self._last = monotonic()
+        self._factor = 1.0
+        self._cooldown_until = 0.0
+        self._bucket_lock = asyncio.Lock()
+
+    async def _acquire(self, lane: str):
+        start = monotonic()
+        if self.active < self.limit and not any(self._waiters.values()):
+            self.active += 1
+        else:
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters[lane].append(fut)
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    self._release() # slot was handed to us right before the cancel
+                else:
+                    self._waiters[lane].remove(fut)
+                raise
+        waited = monotonic() - start
+        lane_stats = self._lane_stats[lane]
+        lane_stats["served"] += 1
+        lane_stats["wait_total"] += waited
+        lane_stats["wait_max"] = max(lane_stats["wait_max"], waited)
+
+    def _release(self):
+        self.active -= 1
+        self._wake()
+
+    def _wake(self):
+        for lane in LANES:
+            waiters = self._waiters[lane]
+            while waiters and self.active < self.limit:
+                fut = waiters.popleft()
+                if not fut.done():
+                    self.active += 1
+                    fut.set_result(None)
+
+    async def _take_token(self, rate: float):
+        async with self._bucket_lock:
+            while True:
+                now = monotonic()
+                if now < self._cooldown_until:
+                    await asyncio.sleep(self._cooldown_until - now)
+                    continue
+                if rate <= 0:
+                    return
+                effective = rate * self._factor
+                self._tokens = min(max(1.0, effective), self._tokens + (now - self._last) * effective)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / effective)
+
+    @asynccontextmanager
+    async def slot(self, cfg, lane: str = "background"):
+        if lane not in self._waiters:
+            lane = "background"
+        self.limit = max(1, int(cfg.scrape_concurrency or 1))
+        self._wake()
+        await self._acquire(lane)
+        try:
+            await self._take_token(float(cfg.scrape_rate or 0))
+            yield
+        finally:
+            self._release()
+
+    def penalize(self, reason: str = ""):
+        """Halve the request rate and pause all requests for a moment."""
+        self._factor = max(self.MIN_FACTOR, self._factor / 2)
+        self._cooldown_until = max(self._cooldown_until, monotonic() + min(60, 2 / self._factor))
+        get_logger().warning(f"Vendor pushed back{f' ({reason})' if reason else ''}, slowing down to {self._factor:.0%} of the configured rate")
+
+    def reward(self):
+        self._factor = min(1.0, self._factor + 0.05)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": sum(len(w) for w in self._waiters.values()),
+            "limit": self.limit,
+            "rate_factor": round(self._factor, 2),
+            "cooldown": max(0.0, round(self._cooldown_until - monotonic(), 1)),
+            "lanes": {
+                lane: {
+                    "waiting": len(self._waiters[lane]),
+                    "served": st["served"],
+                    "avg_wait": round(st["wait_total"] / st["served"], 3) if st["served"] else 0.0,
+                    "max_wait": round(st["wait_max"], 3),
+                } for lane, st in self._lane_stats.items()
+            },
+        }
@@ -0,0 +1,241 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+from time import time
+from typing import Callable, Optional
+from uuid import uuid4
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.config import ConfigManager
+from backend.datamodels import Author
+from backend.dependencies import get_error_logger, get_logger, get_scorer
+from backend.exceptions import AuthorError, BaseError
+from backend.services.author_service import save_author_to_db, save_author_sync
+from backend.services.scrape import scrape_all_author_data, scrape_progress, scrape_search, track
+
+KEEP_FINISHED = 100
+
+class ImportJob:
+    """
+    Author or series import running in the background. `progress` maps a stage
+    (pages, editions, db) to done/total counters and is filled by the scrape functions.
+    """
+
+    def __init__(self, kind: str, target: str):
+        self.id = uuid4().hex
+        self.kind = kind
+        self.target = target
+        self.status = "queued"
+        self.progress: dict[str, dict] = {}
+        self.result = None
+        self.error: Optional[str] = None
+        self.created = time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def finish(self, status: str, error: str = None):
+        self.status = status
+        self.error = error
+        self.finished = time()
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "target": self.target,
+            "status": self.status,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+_jobs: OrderedDict[str, ImportJob] = OrderedDict()
+_running = 0
+_turn = asyncio.Condition()
+
+async def _acquire(cfg: ConfigManager):
+    global _running
+    async with _turn:
+        # read on every wake up, so a changed limit applies to queued jobs as well
+        await _turn.wait_for(lambda: _running < max(1, int(cfg.import_concurrency or 1)))
+        _running += 1
+
+async def _release():
+    global _running
+    async with _turn:
+        _running -= 1
+        _turn.notify_all()
+
+async def _run(state, job: ImportJob, work: Callable, slot: bool = True):
+    try:
+        if slot:
+            await _acquire(state.cfg_manager)
+    except asyncio.CancelledError:
+        job.finish("canceled")
+        return
+    job.status = "running"
+    job.started = time()
+    scrape_progress.set(job.progress)
+    try:
+        async with AsyncSession(state.engine) as session:
+            job.result = await work(session)
+        job.finish("done")
+        get_logger().info(f"Import of {job.kind} {job.target} finished")
+    except asyncio.CancelledError:
+        job.finish("canceled")
+        get_logger().info(f"Import of {job.kind} {job.target} canceled")
+    except BaseError as e:
+        job.finish("failed", e.detail)
+        get_logger().error(f"Import of {job.kind} {job.target} failed: {e.detail}")
+    except Exception as e:
+        job.finish("failed", str(e))
+        get_error_logger().exception(e)
+        get_logger().error(f"Import of {job.kind} {job.target} failed: {e}")
+    finally:
+        if slot:
+            await _release()
+
+def _prune():
+    finished = [job_id for job_id, job in _jobs.items() if not job.active]
+    for job_id in finished[:max(0, len(finished) - KEEP_FINISHED)]:
+        del _jobs[job_id]
+
+def submit_import(state, kind: str, target: str, work: Callable, slot: bool = True) -> ImportJob:
+    """
+    Queue `work(session)` as a background import. An active import of the same target is reused.
+    Without `slot` the job starts right away and `work` has to take import slots itself.
+    """
+    for job in _jobs.values():
+        if job.active and job.kind == kind and job.target == target:
+            return job
+    job = ImportJob(kind, target)
+    _jobs[job.id] = job
+    job.task = asyncio.create_task(_run(state, job, work, slot))
+    _prune()
+    return job
+
+def get_import(job_id: str) -> ImportJob:
+    if job := _jobs.get(job_id):
+        return job
+    raise AuthorError(status_code=404, detail="Import job not found")
+
+def list_imports() -> list[ImportJob]:
+    return list(_jobs.values())
+
+def cancel_import(job_id: str) -> ImportJob:
+    job = get_import(job_id)
+    if job.active and job.task:
+        job.task.cancel()
+    return job
+
+async def stop_imports():
+    tasks = [job.task for job in _jobs.values() if job.active and job.task]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def normalize_entries(entries: list[str]) -> list[str]:
+    return list(dict.fromkeys(e.strip() for e in entries if e and e.strip()))
+
+def bulk_target(entries: list[str], override: bool = False) -> str:
+    """Job target of a bulk import, only the same list (in any order) is treated as the same import."""
+    entries = normalize_entries(entries)
+    digest = hashlib.sha1("\n".join(sorted(entries) + [str(override)]).encode()).hexdigest()[:12]
+    return f"{len(entries)} authors ({digest})"
+
+async def resolve_author(entry: str, cfg: ConfigManager) -> tuple[Optional[str], str]:
+    """Author id and name for a bulk import entry, names are looked up with the vendor search."""
+    if entry.isdigit():
+        return entry, ""
+    scorer = get_scorer()
+    scored = [(scorer(entry, a["name"]), a) for a in await scrape_search(entry, cfg)]
+    score, best = max(scored, key=lambda x: x[0], default=(0, None))
+    if best is None or score <= 80:
+        return None, ""
+    return best["key"], best["name"]
+
+async def bulk_import_authors(session: AsyncSession, cfg: ConfigManager, entries: list[str], override: bool = False) -> dict:
+    """
+    Import a list of author ids or names. Every author is resolved and scraped in one of the
+    `import_concurrency` slots shared with single imports, while a single writer saves finished
+    ones, so scraping and DB writes overlap without competing for the database.
+    Submit it with slot=False, it would otherwise hold a slot its own workers wait for.
+    """
+    start = time()
+    entries = normalize_entries(entries)
+    report = {"total": len(entries), "imported": [], "skipped": [], "unresolved": [], "failed": []}
+    limit = max(1, int(cfg.import_concurrency or 1))
+    pending: asyncio.Queue = asyncio.Queue()
+    for entry in entries:
+        pending.put_nowait(entry)
+    scraped: asyncio.Queue = asyncio.Queue(maxsize=limit) # scrapers wait for the writer instead of piling up results
+    existing = set((await session.exec(select(Author.key))).all())
+    claimed = set()
+    track("authors", total=len(entries))
+
+    def fail(entry: str, e: Exception):
+        detail = e.detail if isinstance(e, BaseError) else str(e)
+        if not isinstance(e, BaseError):
+            get_error_logger().exception(e)
+        get_logger().error(f"Bulk import of {entry} failed: {detail}")
+        report["failed"].append({"entry": entry, "error": detail})
+        track("authors", done=1)
+
+    async def scrape_worker():
+        while not pending.empty():
+            entry = pending.get_nowait()
+            await _acquire(cfg)
+            try:
+                author_id, name = await resolve_author(entry, cfg)
+                if author_id is None:
+                    report["unresolved"].append(entry)
+                    track("authors", done=1)
+                    continue
+                if author_id in claimed or (author_id in existing and not override):
+                    report["skipped"].append({"entry": entry, "key": author_id})
+                    track("authors", done=1)
+                    continue
+                claimed.add(author_id)
+                data = await scrape_all_author_data(author_id, cfg, name)
+            except Exception as e:
+                fail(entry, e)
+                continue
+            finally:
+                await _release()
+            await scraped.put((entry, author_id, data))
+
+    async def writer():
+        while (item := await scraped.get()) is not None:
+            entry, author_id, data = item
+            try:
+                await save_author_to_db(author_id, session, data, override, cfg.bulk_insert_threshold or 0)
+                await save_author_sync(author_id, session, data["author_data"]["_pages"], data["author_data"]["_books"])
+                report["imported"].append({"entry": entry, "key": author_id, "name": data["author_data"].get("name")})
+                track("authors", done=1)
+            except Exception as e:
+                await session.rollback()
+                fail(entry, e)
+            session.expunge_all() # keep the identity map from growing with every author
+
+    workers = [asyncio.create_task(scrape_worker()) for _ in range(min(limit, len(entries)))]
+    writer_task = asyncio.create_task(writer())
+    try:
+        await asyncio.gather(*workers)
+        await scraped.put(None)
+        await writer_task
+    finally:
+        for task in [*workers, writer_task]:
+            task.cancel()
+    report["duration"] = round(time() - start, 1)
+    get_logger().info(f"Bulk import finished in {report['duration']}s: {len(report['imported'])} imported, {len(report['skipped'])} skipped, "
+                      f"{len(report['unresolved'])} unresolved, {len(report['failed'])} failed")
+    return report
@@ -3,6 +3,8 @@ from contextlib import suppress
 from typing import Optional
 from backend.dependencies import get_error_logger, get_logger
 from backend.services.filehelper import scan_and_move_all_files, rescan_files, reimport_files
+from backend.services.request import sweep_cache, refresh_clearance
+from backend.services.author_service import refresh_library
 
 mapping = {
     "import_files": {
@@ -20,6 +22,21 @@ mapping = {
         "task_coro": reimport_files,
         "name": "ImportForeignJob",
     },
+    "sweep_cache": {
+        "interval_attr": "cache_sweep_interval",
+        "task_coro": sweep_cache,
+        "name": "ScrapeCacheSweepJob",
+    },
+    "refresh_clearance": {
+        "interval_attr": "clearance_refresh_interval",
+        "task_coro": refresh_clearance,
+        "name": "RefreshClearanceJob",
+    },
+    "refresh_library": {
+        "interval_attr": "refresh_interval",
+        "task_coro": refresh_library,
+        "name": "RefreshLibraryJob",
+    },
 }
 
 def get_tasks(state):
@@ -39,7 +56,7 @@ def get_job_args(key: str):
     return mapping[key]
 
 def init_jobs(state):
-    for key in ("import_files", "check_deleted", "reimport"):
+    for key in ("import_files", "check_deleted", "reimport", "sweep_cache", "refresh_clearance", "refresh_library"):
         if not key in get_tasks(state):
             get_tasks(state)[key] = asyncio.create_task(periodic_task(state, **get_job_args(key)))
 
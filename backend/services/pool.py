@@ -0,0 +1,89 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from backend.dependencies import get_logger
+
+
+class PagePool:
+    """
+    Bounded pool of warm playwright pages sharing one browser context.
+    Pages are leased per request and recycled after `max_uses` leases or
+    as soon as a request on them fails.
+    """
+
+    def __init__(self, browser, size: int = 4, max_uses: int = 50, storage_state: dict = None):
+        self.browser = browser
+        self.storage_state = storage_state
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.context = None
+        self._idle: list = []
+        self._uses: dict = {}
+        self._slots = asyncio.Semaphore(self.size)
+        self._lock = asyncio.Lock()
+
+    async def get_context(self, fresh: bool = False):
+        async with self._lock:
+            if fresh and self.context is not None:
+                with suppress(Exception):
+                    self.storage_state = await self.context.storage_state()
+                with suppress(Exception):
+                    await self.context.close()
+                self.context = None
+            if self.context is None:
+                self.context = await self.browser.new_context(storage_state=self.storage_state)
+            return self.context
+
+    async def _new_page(self):
+        try:
+            page = await (await self.get_context()).new_page()
+        except Exception as e:
+            get_logger().debug(f"Browser context unusable ({e}), creating a new one")
+            self._idle.clear()
+            self._uses.clear()
+            page = await (await self.get_context(fresh=True)).new_page()
+        self._uses[page] = 0
+        return page
+
+    async def _acquire(self):
+        while self._idle:
+            page = self._idle.pop()
+            if not page.is_closed():
+                return page
+            self._uses.pop(page, None)
+        return await self._new_page()
+
+    async def _release(self, page, healthy: bool):
+        uses = self._uses.get(page, 0) + 1
+        if healthy and not page.is_closed() and uses < self.max_uses:
+            self._uses[page] = uses
+            self._idle.append(page)
+            return
+        get_logger().log(5, f"Recycling page after {uses} uses{'' if healthy else ' (failed request)'}")
+        self._uses.pop(page, None)
+        with suppress(Exception):
+            await page.close()
+
+    @asynccontextmanager
+    async def lease(self):
+        async with self._slots:
+            page = await self._acquire()
+            healthy = False
+            try:
+                yield page
+                healthy = True
+            finally:
+                await self._release(page, healthy)
+
+    def stats(self) -> dict:
+        return {"size": self.size, "idle": len(self._idle), "open": len(self._uses)}
+
+    async def close(self):
+        pages, self._idle = list(self._uses), []
+        self._uses.clear()
+        for page in pages:
+            with suppress(Exception):
+                await page.close()
+        if self.context is not None:
+            with suppress(Exception):
+                await self.context.close()
+            self.context = None
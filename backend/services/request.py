@@ -1,17 +1,32 @@
+import json
 import logging
 from pathlib import Path
-from pickle import dump, load
 from time import time
 import os
 from urllib.parse import urlencode
 from backend.config import ConfigManager
 import asyncio
+from collections import Counter
+from contextvars import ContextVar
 from backend.dependencies import get_error_logger, get_logger
 from backend.exceptions import ScrapeError
 from contextlib import suppress
 from playwright.async_api import async_playwright
 from playwright_stealth import Stealth
 from cloudscraper import create_scraper
+from cloudscraper.exceptions import CloudflareException
+from random import random, uniform
+from backend.services.cache import ScrapeCache, make_key
+from backend.services.pool import PagePool
+from backend.services.governor import RateGovernor
+
+CACHE_TTL = 5*24*3600
+CACHE_MAX_STALE = 30*24*3600
+PUSHBACK_STATUS = (403, 429, 503)
+RETRY_STATUS = PUSHBACK_STATUS + (500, 502, 504)
+CLEARANCE_COOKIES = ("cf_clearance", "__cf_bm", "datadome")
+SESSION_SAVE_INTERVAL = 300
+vendor = os.getenv("VENDOR")
 
 try:
     cache_dir = os.getenv("CONFIG_DIR", "/config")
@@ -22,15 +37,45 @@ except Exception as exc:
     get_logger().error(f"Failed to get cache directory")
     get_error_logger().exception(exc)
 scraper = None
+pool: PagePool = None
+_scraper_loaded = asyncio.Event()
+
+_cache = ScrapeCache(cache_dir.with_name("cache.db"), legacy=cache_dir)
+session_file = cache_dir.with_name("session.json")
+_fixtures = ScrapeCache(cache_dir.with_name("fixtures.db"))
+_session_saved = 0.0
+_inflight: dict[str, asyncio.Task] = {}
+stats = Counter()
+governor = RateGovernor()
+scrape_lane: ContextVar[str] = ContextVar("scrape_lane", default="background")
+
+
+class RequestBudget:
+    """Vendor requests a job may start, fetches it joins or serves from the cache are free. A limit of 0 is unlimited."""
 
-try: _cache = load(cache_dir.open("rb"))
-except FileNotFoundError: _cache = {}
-except Exception as e: get_logger().error(f"Failed to load cache: {e}")
+    def __init__(self, limit: int = 0):
+        self.limit = limit
+        self.used = 0
+
+    @property
+    def left(self) -> bool:
+        return not self.limit or self.used < self.limit
+
+    def spend(self, url: str):
+        if not self.left:
+            raise ScrapeError(status_code=429, detail=f"Request budget of {self.limit} used up before {url}")
+        self.used += 1
+
+request_budget: ContextVar[RequestBudget | None] = ContextVar("request_budget", default=None)
 
 
 async def reload_scraper(state):
-    global scraper
+    global scraper, pool
     get_logger().debug("Reloading scraper...")
+    await save_session()
+    if pool:
+        await pool.close()
+        pool = None
     with suppress(Exception):
         await state.browser.close()
     with suppress(Exception):
@@ -41,29 +86,162 @@ async def reload_scraper(state):
             raise ScrapeError(status_code=500, detail="Playwright is not supported on Windows")
         state.playwright = await Stealth().use_async(async_playwright()).__aenter__()
         state.browser = await state.playwright.chromium.launch(headless=True)
+        pool = PagePool(state.browser, size=state.cfg_manager.scrape_pool_size, max_uses=state.cfg_manager.scrape_page_max_uses,
+                        storage_state=load_session().get("playwright"))
     else:
         state.browser = create_scraper()
+        restore_cloudscraper_session(state.browser, load_session().get("cloudscraper"))
     scraper = state.browser
+    _scraper_loaded.set()
+
+async def wait_for_scraper():
+    """Jobs start before the scraper is loaded, wait for it instead of skipping a whole job interval."""
+    await _scraper_loaded.wait()
+
+async def close_scraper():
+    global pool
+    await save_session()
+    if pool:
+        await pool.close()
+        pool = None
+    _cache.close()
+    _fixtures.close()
+
+
+def load_session() -> dict:
+    try:
+        return json.loads(session_file.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        get_logger().error(f"Failed to load scraper session: {e}")
+        return {}
+
+def restore_cloudscraper_session(session, saved: dict = None):
+    if not saved:
+        return
+    now = time()
+    for c in saved.get("cookies", []):
+        if c.get("expires") and c["expires"] < now:
+            continue
+        session.cookies.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"), expires=c.get("expires"), secure=c.get("secure", False))
+    if saved.get("user_agent"):
+        session.headers["User-Agent"] = saved["user_agent"] # clearance is bound to the user agent that earned it
+    get_logger().debug(f"Restored {len(session.cookies)} cookies for cloudscraper")
+
+async def current_session() -> tuple[str, dict]:
+    if pool and pool.context:
+        return "playwright", await pool.context.storage_state()
+    if scraper is not None and hasattr(scraper, "cookies"):
+        cookies = [{
+            "name": c.name, "value": c.value, "domain": c.domain, "path": c.path,
+            "expires": c.expires, "secure": c.secure
+        } for c in scraper.cookies]
+        return "cloudscraper", {"cookies": cookies, "user_agent": scraper.headers.get("User-Agent")}
+    return None, None
+
+async def save_session():
+    """Persist cookies and clearance tokens of the active scraper, so a restart does not need to solve the challenge again."""
+    global _session_saved
+    try:
+        backend, data = await current_session()
+        if backend is None:
+            return
+        saved = load_session()
+        saved[backend] = data
+        session_file.parent.mkdir(parents=True, exist_ok=True)
+        session_file.write_text(json.dumps(saved), encoding="utf-8")
+        _session_saved = time()
+        get_logger().log(5, f"Saved {backend} session with {len(data.get('cookies', []))} cookies")
+    except Exception as e:
+        get_logger().error(f"Failed to save scraper session: {e}")
+
+async def clearance_expiry() -> float:
+    """Earliest expiry of the vendor clearance cookies, 0 if there are none."""
+    _, data = await current_session()
+    cookies = [c for c in (data or {}).get("cookies", []) if c.get("expires") and c["expires"] > 0]
+    clearance = [c for c in cookies if c["name"] in CLEARANCE_COOKIES] or cookies
+    return min((c["expires"] for c in clearance), default=0)
 
+async def refresh_clearance(state):
+    cfg = state.cfg_manager
+    if not vendor or cfg.scrape_mode == "replay":
+        return
+    await wait_for_scraper()
+    expiry = await clearance_expiry()
+    if expiry and expiry - time() > 2 * cfg.clearance_refresh_interval:
+        get_logger().debug(f"Vendor clearance valid for another {int(expiry - time())}s")
+        return
+    get_logger().debug("Refreshing vendor clearance")
+    await governed_fetch(cfg, vendor, {}, xhr=False)
+    await save_session()
+
+async def fetch_with_request_context(target: str):
+    """
+    GET a JSON endpoint through the browser context's APIRequestContext, which shares
+    cookies (and therefore any earned clearance) with the pooled pages without rendering a tab.
+    Returns None if the vendor answers with a challenge, so the caller can fall back to navigation.
+    """
+    get_logger().log(5, f"Using playwright#request to GET {target}")
+    context = await pool.get_context()
+    response = await context.request.get(target, headers={"Accept": "application/json"})
+    try:
+        if response.status in PUSHBACK_STATUS:
+            get_logger().debug(f"Request context got {response.status} for {target}, falling back to navigation")
+            return None
+        if response.status != 200:
+            raise ScrapeError(status_code=response.status, detail=await response.text())
+        return await response.body() or None
+    finally:
+        await response.dispose()
+
+def uses_cache(cfg: ConfigManager) -> bool:
+    # skip_cache always goes to the vendor. Replay always goes to the fixtures, so every run pays the
+    # simulated latency and errors, and recorded data never lands in cache.db stamped as fresh.
+    return not cfg.skip_cache and cfg.scrape_mode != "replay"
+
+async def record_fixture(cfg: ConfigManager, key: str, data):
+    if cfg.scrape_mode != "record":
+        return
+    try:
+        await _fixtures.set(key, data, time())
+    except Exception as e:
+        get_logger().error(f"Failed to record fixture for {key}: {e}")
+
+async def replay_fixture(cfg: ConfigManager, url: str, params: dict):
+    """Offline stand-in for the vendor: serves recorded responses with simulated latency and errors."""
+    latency = (cfg.replay_latency or 0) / 1000
+    if latency > 0:
+        await asyncio.sleep(latency * uniform(0.5, 1.5))
+    if random() < (cfg.replay_error_rate or 0):
+        raise ScrapeError(status_code=429 if random() < 0.5 else 503, detail=f"Injected replay error for {url}")
+    entry = await _fixtures.get(make_key(url, params))
+    if entry is None:
+        raise ScrapeError(status_code=404, detail=f"No fixture recorded for {make_key(url, params)}")
+    return entry["data"]
 
 async def fetch(cfg: ConfigManager, url: str, params: dict, xhr: bool) -> dict:
+    if cfg.scrape_mode == "replay":
+        return await replay_fixture(cfg, url, params)
     target = f"{url}?{urlencode(params)}" if params else url
-    if cfg.playwright:
-        page = await scraper.new_page()
-        if xhr:
-            get_logger().log(5, f"Using playwright#expect_response to GET {target}")
-            async with page.expect_response(target) as response_info:
+    data = None
+    if cfg.playwright and xhr and cfg.playwright_request_context:
+        data = await fetch_with_request_context(target)
+    if cfg.playwright and data is None:
+        async with pool.lease() as page:
+            if xhr:
+                get_logger().log(5, f"Using playwright#expect_response to GET {target}")
+                async with page.expect_response(target) as response_info:
+                    await page.goto(target)
+                response = await response_info.value
+                if response.status != 200:
+                    raise ScrapeError(status_code=response.status, detail=response.text)
+                data = await response.body()
+            else:
+                get_logger().log(5, f"Using playwright#goto to GET {target}")
                 await page.goto(target)
-            response = await response_info.value
-            if response.status != 200:
-                raise ScrapeError(status_code=response.status, detail=response.text)
-            data = await response.body()
-        else:
-            get_logger().log(5, f"Using playwright#goto to GET {target}")
-            await page.goto(target)
-            data = await page.content()
-        await page.close()
-    else:
+                data = await page.content()
+    elif not cfg.playwright:
         get_logger().log(5, f"Using cloudscraper to GET {target}")
         response = await asyncio.to_thread(scraper.get, target)
         if response.status_code != 200:
@@ -73,14 +251,112 @@ async def fetch(cfg: ConfigManager, url: str, params: dict, xhr: bool) -> dict:
         raise ScrapeError(status_code=response.status_code, detail=response.text)
     return data
 
-async def fetch_or_cached(cfg: ConfigManager, url: str, params: dict = {}, xhr: bool = True):
-    key = (url, tuple(sorted(params.items())))
+async def fetch_or_cached(cfg: ConfigManager, url: str, params: dict = {}, xhr: bool = True, meta: bool = False, max_age: float = None):
+    """
+    Return the vendor response for url/params from the cache or the vendor.
+    With `stale_while_revalidate` enabled, expired entries are returned right away and
+    refreshed in the background. If `meta` is set, a (data, freshness) tuple is returned.
+    `max_age` (seconds) tightens the TTL for callers that need recent data and bypasses stale serving,
+    `skip_cache` and the replay scrape mode bypass the cache entirely.
+    """
+    key = make_key(url, params)
     now = time()
-    if not cfg.skip_cache and key in _cache and now - _cache[key]["time"] < 5*24*3600:
+    ttl = CACHE_TTL if max_age is None else min(max_age, CACHE_TTL)
+    swr = cfg.stale_while_revalidate and max_age is None and uses_cache(cfg)
+    entry = await _cache.get(key) if uses_cache(cfg) else None
+    if entry and now - entry["time"] < ttl:
         get_logger().log(5, f"Using cache for {url}")
-        data = _cache[key]["data"]
-    else:
-        data = await fetch(cfg, url, params, xhr)
-        _cache[key] = {"time": now, "data": data}
-        dump(_cache, cache_dir.open("wb"))
-    return data
\ No newline at end of file
+        stats["cache_hits"] += 1
+        await record_fixture(cfg, key, entry["data"])
+        return with_freshness(entry["data"], entry["time"], now, stale=False, revalidating=False) if meta else entry["data"]
+    if entry and swr and now - entry["time"] < CACHE_MAX_STALE:
+        get_logger().log(5, f"Using stale cache for {url}, revalidating in background")
+        stats["stale_hits"] += 1
+        if (budget := request_budget.get()) is None or budget.left:
+            start_fetch(cfg, key, url, params, xhr, lane="background")
+        await record_fixture(cfg, key, entry["data"])
+        return with_freshness(entry["data"], entry["time"], now, stale=True, revalidating=True) if meta else entry["data"]
+    if key in _inflight:
+        get_logger().log(5, f"Joining in-flight request for {url}")
+        stats["coalesced"] += 1
+    # shielded so a cancelled caller does not abort the fetch for everyone waiting on it
+    data = await asyncio.shield(start_fetch(cfg, key, url, params, xhr))
+    return with_freshness(data, time(), time(), stale=False, revalidating=False) if meta else data
+
+async def cached_stamp(cfg: ConfigManager, url: str, params: dict = {}) -> float | None:
+    """Fetch time of the cache entry fetch_or_cached would serve as fresh, None if it would go to the vendor."""
+    if not uses_cache(cfg):
+        return None
+    stamp = await _cache.stamp(make_key(url, params))
+    if stamp is None or time() - stamp >= CACHE_TTL:
+        return None
+    return stamp
+
+def with_freshness(data, fetched: float, now: float, stale: bool, revalidating: bool):
+    return data, {"time": fetched, "age": round(now - fetched, 1), "stale": stale, "revalidating": revalidating}
+
+def start_fetch(cfg: ConfigManager, key: str, url: str, params: dict, xhr: bool, lane: str = None) -> asyncio.Task:
+    """Return the in-flight fetch for key, starting one if there is none (single flight)."""
+    if key in _inflight:
+        return _inflight[key]
+    if (budget := request_budget.get()) is not None:
+        budget.spend(url)
+    task = asyncio.create_task(fetch_and_store(cfg, key, url, params, xhr, lane))
+    _inflight[key] = task
+    task.add_done_callback(lambda t: (_inflight.pop(key, None), t.cancelled() or t.exception()))
+    return task
+
+async def governed_fetch(cfg: ConfigManager, url: str, params: dict, xhr: bool):
+    retries = max(0, int(cfg.scrape_retries or 0))
+    for attempt in range(retries + 1):
+        async with governor.slot(cfg, scrape_lane.get()):
+            try:
+                data = await fetch(cfg, url, params, xhr)
+                governor.reward()
+                return data
+            except ScrapeError as e:
+                if e.status_code not in RETRY_STATUS or attempt == retries:
+                    raise
+                if e.status_code in PUSHBACK_STATUS:
+                    governor.penalize(f"HTTP {e.status_code}")
+                error = e
+            except CloudflareException as e:
+                if attempt == retries:
+                    raise ScrapeError(status_code=503, detail=f"Challenge not solved for {url}", exception=e)
+                governor.penalize(type(e).__name__)
+                error = e
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                error = e
+        delay = min(60, 2**attempt) * uniform(0.5, 1.5)
+        stats["retries"] += 1
+        get_logger().debug(f"Retrying {url} in {delay:.1f}s ({attempt+1}/{retries}) after: {error}")
+        await asyncio.sleep(delay)
+
+async def fetch_and_store(cfg: ConfigManager, key: str, url: str, params: dict, xhr: bool, lane: str = None):
+    if lane:
+        scrape_lane.set(lane)
+    stats["fetched"] += 1
+    data = await governed_fetch(cfg, url, params, xhr)
+    await record_fixture(cfg, key, data)
+    try:
+        if uses_cache(cfg):
+            await _cache.set(key, data, time(), max_bytes=cfg.cache_max_bytes or 0, max_entries=cfg.cache_max_entries or 0)
+    except Exception as e:
+        get_logger().error(f"Failed to write cache entry for {url}: {e}")
+    if time() - _session_saved > SESSION_SAVE_INTERVAL:
+        await save_session()
+    return data
+
+async def use_interactive_lane():
+    """Router dependency: vendor requests made while serving this request jump ahead of bulk crawls."""
+    scrape_lane.set("interactive")
+
+async def sweep_cache(state):
+    # stale entries are still worth serving while they get revalidated
+    removed = await _cache.expire(CACHE_MAX_STALE if state.cfg_manager.stale_while_revalidate else CACHE_TTL)
+    get_logger().debug(f"Removed {removed} expired scrape cache entries")
+
+def scrape_stats() -> dict:
+    return {**stats, "inflight": len(_inflight), "cache": _cache.stats(), "pool": pool.stats() if pool else None, "governor": governor.stats()}
@@ -1,8 +1,12 @@
 import re
 import asyncio
+from collections import OrderedDict
+from contextvars import ContextVar
+from functools import lru_cache
 from backend.dependencies import get_logger
-from backend.services.request import fetch_or_cached
-from bs4 import BeautifulSoup
+from backend.services.request import fetch_or_cached, cached_stamp, scrape_lane, stats
+from bs4 import BeautifulSoup, SoupStrainer
+from importlib.util import find_spec
 from io import BytesIO
 import json
 from backend.config import ConfigManager
@@ -14,7 +18,51 @@ series="/api/2003/serienartikel/v4/"
 author="/autor/-"
 suche = "/api/rest/suche/v5"
 
-async def scrape_search(q: str, cfg: ConfigManager, page: int = 1):
+AUTHOR_CONTAINERS = frozenset(("autor-avatar", "autor-name", "autor-portrait"))
+HTML_PARSER = "lxml" if find_spec("lxml") else "html.parser" # lxml is optional but a lot faster
+PARSED_CACHE_SIZE = 4096
+
+_parsed: OrderedDict[tuple, tuple] = OrderedDict()
+scrape_progress: ContextVar[dict | None] = ContextVar("scrape_progress", default=None)
+
+def track(stage: str, done: int = 0, total: int = 0):
+    """Count progress of a stage for the import job running in this context, if any."""
+    if (progress := scrape_progress.get()) is None:
+        return
+    entry = progress.setdefault(stage, {"done": 0, "total": 0})
+    entry["done"] += done
+    entry["total"] += total
+
+async def _dep_stamps(cfg: ConfigManager, deps: list[tuple[str, dict]]) -> list:
+    return list(await asyncio.gather(*[cached_stamp(cfg, url, params) for url, params in deps]))
+
+async def get_parsed(cfg: ConfigManager, key: tuple):
+    """Parsed result for key, as long as none of the raw responses it was built from changed or expired."""
+    if cfg.scrape_mode != "live": # record and replay have to see every raw response
+        return None
+    if (hit := _parsed.get(key)) is None:
+        return None
+    deps, stamps, value = hit
+    if await _dep_stamps(cfg, deps) != stamps:
+        _parsed.pop(key, None)
+        return None
+    _parsed.move_to_end(key)
+    stats["parsed_hits"] += 1
+    return value
+
+async def put_parsed(cfg: ConfigManager, key: tuple, deps: list[tuple[str, dict]], value):
+    if cfg.scrape_mode != "live":
+        return
+    stamps = await _dep_stamps(cfg, deps)
+    if None in stamps: # raw response is not cached, so there is nothing to invalidate against
+        return
+    _parsed[key] = (deps, stamps, value)
+    _parsed.move_to_end(key)
+    while len(_parsed) > PARSED_CACHE_SIZE:
+        _parsed.popitem(last=False)
+
+async def search_authors(q: str, cfg: ConfigManager, page: int = 1) -> tuple[set[tuple[str, str]], int]:
+    """(identNr, name) of the authors on one search page and the number of pages."""
     params = {
         "suchbegriff": q,
         "artikelProSeite": "5",
@@ -28,15 +76,65 @@ async def scrape_search(q: str, cfg: ConfigManager, page: int = 1):
         for personen in artikel.get("personen", []):
             if personen["typ"] == "Autor":
                 author_datas.add((str(personen["identNr"]), personen.get("name")))
+    return author_datas, data.get("paginierung", {}).get("anzahlSeiten", page)
+
+async def scrape_search(q: str, cfg: ConfigManager, page: int = 1):
+    author_datas, _ = await search_authors(q, cfg, page)
     coros = [scrape_author_data(identNr, cfg, name, metadata_only=True) for identNr, name in author_datas] # TODO LOGGGG
     ids = await asyncio.gather(*coros)
     return [id_ for id_ in ids if id_ is not None]
 
+_prefetches: set[asyncio.Task] = set()
+
+async def prefetch_search(q: str, cfg: ConfigManager, page: int):
+    """Warm the caches for a search page the UI is likely to ask for next."""
+    scrape_lane.set("background")
+    try:
+        await scrape_search(q, cfg, page)
+    except Exception as e:
+        get_logger().debug(f"Prefetching search page {page} for {q} failed: {e}")
+
+async def scrape_search_stream(q: str, cfg: ConfigManager, page: int = 1, prefetch: bool = False):
+    """
+    Like scrape_search, but yields ("author", card) as soon as each author's metadata resolves,
+    followed by ("end", paging info). With `prefetch` (set by clients that can page), the next
+    page is warmed in the background once this one is done.
+    """
+    author_datas, pages = await search_authors(q, cfg, page)
+    tasks = [asyncio.create_task(scrape_author_data(identNr, cfg, name, metadata_only=True)) for identNr, name in author_datas]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                card = await next_done
+            except Exception as e:
+                get_logger().error(f"Failed to load author card for search {q}: {e}")
+                continue
+            if card is not None:
+                yield "author", card
+    finally:
+        for task in tasks: # client went away
+            task.cancel()
+    if prefetch and page < pages:
+        task = asyncio.create_task(prefetch_search(q, cfg, page + 1))
+        _prefetches.add(task)
+        task.add_done_callback(_prefetches.discard)
+    yield "end", {"page": page, "pages": pages}
+
 async def scrape_book_editions(book_id: str, cfg)-> tuple[list[dict], str]:
+    key = ("editions", book_id, cfg.known_bundles)
+    if (hit := await get_parsed(cfg, key)) is not None:
+        editions, series_name = hit
+        return [dict(ed) for ed in editions], series_name
     data = await fetch_or_cached(cfg, base+book+book_id)
+    editions, series_name = parse_book_editions(book_id, data, cfg)
+    await put_parsed(cfg, key, [(base+book+book_id, {})], (editions, series_name))
+    return [dict(ed) for ed in editions], series_name
+
+def parse_book_editions(book_id: str, data, cfg: ConfigManager) -> tuple[list[dict], str]:
     data = json.load(BytesIO(data))[0]
     editions = []
     series_name = None
+    bundles = get_bundle_matcher(cfg)
     for k in data.get("kategoriePfade", []):
         for j in k:
             if j["text"] == "Bundles":
@@ -49,10 +147,7 @@ async def scrape_book_editions(book_id: str, cfg)-> tuple[list[dict], str]:
         ed_info["bild"] = werk["media"]["bilder"][0]["urlTemplateFixedScaling"].format(resolutionKey="00")
         ed_info["medium"] = werk["shop"]["identNr"]
         if data["serie"]["hatSerienslider"] or data["serie"].get("nummer") or data["serie"].get("name"):
-            is_bndl = False
-            for bndl in cfg.known_bundles.split(","):
-                is_bndl = is_bndl or re.search(bndl, werk["titel"]) is not None
-            if not is_bndl: # we only assign pos if not a bundle #TODO
+            if not bundles.is_bundle(werk["titel"]): # we only assign pos if not a bundle #TODO
                 try:
                     ed_info["_pos"] = float(data["serie"].get("nummer"))
                 except Exception:
@@ -63,60 +158,160 @@ async def scrape_book_editions(book_id: str, cfg)-> tuple[list[dict], str]:
     get_logger().log(5, f"Found {len(editions)} editions for {book_id}")
     return editions, series_name
 
+def _is_author_container(css_class) -> bool:
+    if not css_class:
+        return False
+    return not AUTHOR_CONTAINERS.isdisjoint(css_class.split() if isinstance(css_class, str) else css_class)
+
+_author_strainer = SoupStrainer(class_=_is_author_container)
+
+def parse_author_page(data, parser: str = HTML_PARSER) -> dict:
+    """Extract avatar, name and bio of an author page, building a tree only for their containers."""
+    soup = BeautifulSoup(data, parser, parse_only=_author_strainer)
+    page = {}
+    if (avatar:=soup.find(class_="autor-avatar")) and (img:=avatar.find("img")):
+        page["bild"] = img.get("src")
+    if (name:=soup.find(class_="autor-name")):
+        page["name"] = name.get_text(strip=True)
+    if (bio_container := soup.find(class_="autor-portrait")):
+        if (bio_div := bio_container.find("div", class_="toggle-text-content")):
+            page["bio"] = bio_div.get_text().strip()
+    return page
+
 async def scrape_author_data(author_id: str, cfg: ConfigManager, name:str=None, metadata_only: bool = False):
     author_data={}
     author_data["key"] = author_id
-    data = await fetch_or_cached(cfg, base+author+author_id, xhr=False)
-    soup = await asyncio.to_thread(BeautifulSoup, data, "html.parser")
-    if (avatar:=soup.find(class_="autor-avatar")) and (img:=avatar.find("img")):
-        author_data["bild"] = img.get("src")
+    key = ("author", author_id)
+    if (page := await get_parsed(cfg, key)) is None:
+        data = await fetch_or_cached(cfg, base+author+author_id, xhr=False)
+        page = await asyncio.to_thread(parse_author_page, data)
+        await put_parsed(cfg, key, [(base+author+author_id, {})], page)
+    if "bild" in page:
+        author_data["bild"] = page["bild"]
     if name:
         author_data["name"] = name
-    elif (name:=soup.find(class_="autor-name")):
-        author_data["name"] = name.get_text(strip=True)
-    if (bio_container := soup.find(class_="autor-portrait")):
-        if (bio_div := bio_container.find("div", class_="toggle-text-content")):
-            author_data["bio"] = bio_div.get_text().strip()
+    elif "name" in page:
+        author_data["name"] = page["name"]
+    if "bio" in page:
+        author_data["bio"] = page["bio"]
     if metadata_only:
         if author_data.get("name") is None:
             return
         return author_data
-    author_data["_books"] = set()
+    author_data["_pages"], author_data["_books"] = await scrape_author_books(author_data["name"], cfg)
+    get_logger().log(5, f"Found {len(author_data['_books'])} books for {author_data['name']}")
+    return author_data
+
+async def scrape_author_books(name: str, cfg: ConfigManager, start_page: int = 1, max_age: float = None) -> tuple[int, dict[str, str]]:
+    """
+    Page count and matnrs (with their listing title) of the `mehr-von-autor` listing. The listing is
+    sorted by release date, so a `start_page` > 1 only reads the first page (for the page count) and the tail.
+    """
     params = {
-        "suchbegriff": author_data["name"],
+        "suchbegriff": name,
         "artikelProSeite": "30",
         "seite": 1,
         "filterSPRACHE": get_language(cfg),
         "sortierung": "Erscheinungsdatum_asc"
     }
-    _data = await fetch_or_cached(cfg, base+suche+"/mehr-von-autor", params)
+    _data = await fetch_or_cached(cfg, base+suche+"/mehr-von-autor", params, max_age=max_age)
     data = json.load(BytesIO(_data))
-    coros = []
-    for i in range(2, data["paginierung"]["anzahlSeiten"]+1):
-        coros.append(fetch_or_cached(cfg, base+suche+"/mehr-von-autor", {**params, "seite": i}))
-    datas = [_data] + await asyncio.gather(*coros)
+    pages = data["paginierung"]["anzahlSeiten"]
+    rest = range(max(2, start_page), pages+1)
+    track("pages", done=1, total=1+len(rest))
+    async def fetch_page(i):
+        page = await fetch_or_cached(cfg, base+suche+"/mehr-von-autor", {**params, "seite": i}, max_age=max_age)
+        track("pages", done=1)
+        return page
+    datas = [_data] + await asyncio.gather(*[fetch_page(i) for i in rest])
+    matnrs = {}
     for data in datas:
         data = json.load(BytesIO(data))
         for artikel in data["artikelliste"]:
-            author_data["_books"].add(artikel["identifier"]["matnr"])
-    get_logger().log(5, f"Found {len(author_data['_books'])} books for {author_data['name']}")
-    return author_data
+            matnrs[artikel["identifier"]["matnr"]] = artikel.get("titel")
+    return pages, matnrs
 
 async def scrape_all_author_data(author_id: str, cfg: ConfigManager, name: str) -> dict:
     author_data = await scrape_author_data(author_id, cfg, name=name)
-    coros = [scrape_book_editions(book_edition_id, cfg) for book_edition_id in author_data.get("_books", set())]
-    books = await asyncio.gather(*coros)
+    books = await scrape_book_groups(author_data.get("_books", set()), cfg)
     return {"author_data": author_data, "books": books}
 
-async def scrape_book_series(book_id: str, cfg: ConfigManager):
+async def scrape_author_delta(cfg: ConfigManager, name: str, known_pages: int, known_items: set[str]) -> dict:
+    """Only the tail of the author listing (re-read, not cached) and the editions of matnrs not seen before."""
+    pages, matnrs = await scrape_author_books(name, cfg, start_page=known_pages, max_age=0)
+    new = {matnr: title for matnr, title in matnrs.items() if matnr not in known_items}
+    get_logger().log(5, f"Delta sync for {name}: {len(new)} new of {len(matnrs)} listed books (pages {max(2, known_pages)}-{pages})")
+    books = await scrape_book_groups(new, cfg)
+    return {"pages": pages, "items": known_items | matnrs.keys(), "books": books}
+
+async def scrape_book_groups(matnrs, cfg: ConfigManager) -> list[tuple[list[dict], str]]:
+    """
+    scrape_book_editions for every matnr, except those already returned as a sibling
+    (werkArtikel) of an earlier one. `matnrs` may map each matnr to its listing title: formats of
+    one work share it, so matnrs with the same cleaned title form a group of which only one is
+    fetched at a time, and the rest is only fetched if that work group did not contain them.
+    """
+    titles = matnrs if isinstance(matnrs, dict) else {}
+    groups: dict[str, list[str]] = {}
+    for matnr in matnrs:
+        title = titles.get(matnr)
+        groups.setdefault(clean_title(title).casefold() if title else matnr, []).append(matnr)
+    pending = list(groups.values())
+    resolved = set()
+    running: dict[asyncio.Task, list[str]] = {}
     books = []
+    skipped = 0
+    limit = max(1, int(cfg.scrape_concurrency or 1)) * 2
+    track("editions", total=sum(map(len, pending)))
+    try:
+        while pending or running:
+            while pending and len(running) < limit:
+                group = pending.pop()
+                while group and group[-1] in resolved:
+                    group.pop()
+                    skipped += 1
+                    track("editions", done=1)
+                if group:
+                    running[asyncio.create_task(scrape_book_editions(group.pop(), cfg))] = group
+            if not running:
+                break
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                group = running.pop(task)
+                editions, series_name = task.result()
+                resolved.update(ed["key"] for ed in editions)
+                books.append((editions, series_name))
+                track("editions", done=1)
+                if group: # next in line, skipped right away if this work group covered it
+                    pending.append(group)
+    finally:
+        for task in running:
+            task.cancel()
+    stats["siblings_skipped"] += skipped
+    get_logger().log(5, f"Skipped {skipped} of {len(books)+skipped} edition requests already covered by sibling editions")
+    return books
+
+async def scrape_book_series(book_id: str, cfg: ConfigManager, max_age: float = None):
+    key = ("series", book_id, cfg.known_bundles)
+    if max_age is None and (hit := await get_parsed(cfg, key)) is not None:
+        return [dict(b) for b in hit]
     params = {"max": 50, "page": 1}
-    _data = await fetch_or_cached(cfg, base+series+book_id, params)
+    _data = await fetch_or_cached(cfg, base+series+book_id, params, max_age=max_age)
     data = json.load(BytesIO(_data))
-    coros = []
-    for i in range(2, data["totalPages"]+1):
-        coros.append(fetch_or_cached(cfg, base+series+book_id, {**params, "page": i}))
-    datas = [_data] + await asyncio.gather(*coros)
+    pages = [{**params, "page": i} for i in range(1, data["totalPages"]+1)]
+    track("pages", done=1, total=len(pages))
+    async def fetch_page(p):
+        page = await fetch_or_cached(cfg, base+series+book_id, p, max_age=max_age)
+        track("pages", done=1)
+        return page
+    datas = [_data] + await asyncio.gather(*[fetch_page(p) for p in pages[1:]])
+    books = parse_book_series(datas, cfg)
+    await put_parsed(cfg, key, [(base+series+book_id, p) for p in pages], books)
+    return [dict(b) for b in books]
+
+def parse_book_series(datas: list, cfg: ConfigManager) -> list[dict]:
+    books = []
+    bundles = get_bundle_matcher(cfg)
     for d in datas:
         d = json.load(BytesIO(d))
         for werk in d["sliderArtikelList"]:
@@ -125,10 +320,7 @@ async def scrape_book_series(book_id: str, cfg: ConfigManager):
             book_info["titel"] = clean_title(werk["titel"], werk["serie"].get("name"), werk["serie"].get("nummer"))
             book_info["bild"] = werk["media"]["bilder"][0]["urlTemplateFixedScaling"].format(resolutionKey="00")
             book_info["medium"] = werk["shop"]["identNr"]
-            is_bndl = False
-            for bndl in cfg.known_bundles.split(","):
-                is_bndl = is_bndl or re.search(bndl, werk["titel"]) is not None
-            if not is_bndl:
+            if not bundles.is_bundle(werk["titel"]):
                 try:
                     book_info["_pos"] = float(werk["serie"].get("nummer"))
                 except Exception:
@@ -136,6 +328,27 @@ async def scrape_book_series(book_id: str, cfg: ConfigManager):
             books.append(book_info)
     return books
 
+class BundleMatcher:
+    """All `known_bundles` patterns compiled into a single alternation."""
+
+    def __init__(self, known_bundles: str):
+        self.known_bundles = known_bundles
+        self.pattern = re.compile("|".join(f"(?:{bndl})" for bndl in known_bundles.split(",")))
+
+    def is_bundle(self, title: str) -> bool:
+        return self.pattern.search(title) is not None
+
+    def classify(self, titles: list[str]) -> list[bool]:
+        return [self.pattern.search(title) is not None for title in titles]
+
+@lru_cache(maxsize=8)
+def _bundle_matcher(known_bundles: str) -> BundleMatcher:
+    return BundleMatcher(known_bundles)
+
+def get_bundle_matcher(cfg: ConfigManager) -> BundleMatcher:
+    """Matcher for the current `known_bundles` setting, rebuilt only when the setting changes."""
+    return _bundle_matcher(cfg.known_bundles or "")
+
 def get_language(cfg: ConfigManager):
     mapping = {
         "en": 1, "eng": 1,
@@ -167,31 +380,73 @@ def strip_id(url: str):
 def strip_id_from_slug(url: str):
     return url.strip("/").split("/")[-1].split("?")[0].split("-")[-1]
 
-def clean_title(title: str, series_title: str = None, series_pos: int = None, can_be_empty: bool = False):
-    bak = title
+_kuerzung = re.compile(r"\(.*kürz.*\)")
+_leading_non_word = re.compile(r"^[\W]*", flags=re.UNICODE | re.M)
+_trailing_non_word = re.compile(r"[\W]*$", flags=re.UNICODE | re.M)
+_series_article = re.compile(r"^Die", flags=re.UNICODE | re.M)
+_series_reihe = re.compile(r"-*Reihe$", flags=re.UNICODE | re.M)
+_series_serie = re.compile(r"-*Serie$", flags=re.UNICODE | re.M)
 
-    title = fix_diaeresis(title)
-    if series_title:
-        title = re.sub(fr"\b(?:(?:der)|(?:die)|(?:das)|)\W*{re.escape(series_title)}\W", "", title, flags=re.UNICODE | re.I)
-    if series_title and title == bak:
-        title = re.sub(fr"\b(?:(?:der)|(?:die)|(?:das)|)\W*{re.escape(series_title.replace('-', ' '))}\W", "", title, flags=re.UNICODE | re.I)
+class TitleCleaner:
+    """Cleans titles for one (series title, series position) with all patterns compiled once."""
 
+    def __init__(self, series_title: str = None, series_pos: int = None):
+        flags = re.UNICODE | re.I
+        self.series_title = series_title
+        self.series_patterns = []
+        if series_title:
+            self.series_patterns = [
+                re.compile(fr"\b(?:(?:der)|(?:die)|(?:das)|)\W*{re.escape(series_title)}\W", flags),
+                re.compile(fr"\b(?:(?:der)|(?:die)|(?:das)|)\W*{re.escape(series_title.replace('-', ' '))}\W", flags),
+            ]
+        self.leading_pos = re.compile(fr"^(?:(?:b(?:(?:an)|)d)|(?:teil)|(?:folge)|(?:buch)|)\W*0*{series_pos}", flags) # remove leading position
+        self.trailing_pos = re.compile(fr"(?:(?:b(?:(?:an)|)d)|(?:teil)|(?:folge)|(?:buch)|)\W*0*{series_pos}$", flags) # remove traling position
+
+    def clean(self, title: str, can_be_empty: bool = False) -> str:
+        bak = title
+        title = fix_diaeresis(title)
+        if self.series_patterns:
+            title = self.series_patterns[0].sub("", title)
+            if title == bak:
+                title = self.series_patterns[1].sub("", title)
+        title = _kuerzung.sub("", title, 2) # remove (gekürzte Lesung) and alike
+        title = strip_non_word(title)
+        title = self.leading_pos.sub("", title)
+        title = self.trailing_pos.sub("", title)
+        #### Known patterns ####
+        title = title.replace(" - , Teil", "")
+        ########################
+        title = strip_non_word(title)
+        title = reconstruct_parentheses(title)
+        if can_be_empty:
+            return title
+        return title or bak.strip() # sanity check dont return empty string
+
+    def clean_all(self, titles: list[str], can_be_empty: bool = False) -> list[str]:
+        return [self.clean(title, can_be_empty) for title in titles]
+
+def normalize_pos(series_pos) -> int | None:
     try:
-        series_pos = int(float(series_pos))
+        return int(float(series_pos))
     except Exception:
-        series_pos = None
-    title = re.sub(r"\(.*kürz.*\)", "", title, re.I) # remove (gekürzte Lesung) and alike
-    title = strip_non_word(title)
-    title = re.sub(fr"^(?:(?:b(?:(?:an)|)d)|(?:teil)|(?:folge)|(?:buch)|)\W*0*{series_pos}", "", title, flags=re.UNICODE | re.I)# remove leading position
-    title = re.sub(fr"(?:(?:b(?:(?:an)|)d)|(?:teil)|(?:folge)|(?:buch)|)\W*0*{series_pos}$", "", title, flags=re.UNICODE | re.I)# remove traling position
-    #### Known patterns ####
-    title = title.replace(" - , Teil", "")
-    ########################
-    title = strip_non_word(title)
-    title = reconstruct_parentheses(title)
-    if can_be_empty:
-        return title
-    return title or bak.strip() # sanity check dont return empty string
+        return None
+
+@lru_cache(maxsize=4096)
+def _title_cleaner(series_title: str, series_pos: int | None) -> TitleCleaner:
+    return TitleCleaner(series_title, series_pos)
+
+def get_title_cleaner(series_title: str = None, series_pos=None) -> TitleCleaner:
+    return _title_cleaner(series_title or None, normalize_pos(series_pos))
+
+def clean_title(title: str, series_title: str = None, series_pos: int = None, can_be_empty: bool = False):
+    return get_title_cleaner(series_title, series_pos).clean(title, can_be_empty)
+
+def clean_titles(titles: list[str], series_title: str = None, series_pos: int = None, can_be_empty: bool = False) -> list[str]:
+    return get_title_cleaner(series_title, series_pos).clean_all(titles, can_be_empty)
+
+def clean_edition_titles(editions: list[dict], series_title: str = None, can_be_empty: bool = False) -> list[str]:
+    """Clean the titles of a list of scraped editions, each against its own series position."""
+    return [get_title_cleaner(series_title, ed.get("_pos")).clean(ed.get("titel"), can_be_empty) for ed in editions]
 
 def clean_series_title(title: str):
     bak = title
@@ -200,9 +455,9 @@ def clean_series_title(title: str):
     ########################
     title = fix_diaeresis(title)
     title = strip_non_word(title)
-    title = re.sub(r"^Die", "", title, flags=re.UNICODE | re.M)
-    title = re.sub(r"-*Reihe$", "", title, flags=re.UNICODE | re.M)
-    title = re.sub(r"-*Serie$", "", title, flags=re.UNICODE | re.M)
+    title = _series_article.sub("", title)
+    title = _series_reihe.sub("", title)
+    title = _series_serie.sub("", title)
     title = strip_non_word(title)
     title = reconstruct_parentheses(title)
     return title or bak.strip()
@@ -230,8 +485,8 @@ def fix_diaeresis(title: str):
     return title
 
 def strip_non_word(text: str):
-    text = re.sub(r"^[\W]*", "", text, flags=re.UNICODE | re.M)
-    return re.sub(r"[\W]*$", "", text, flags=re.UNICODE | re.M)
+    text = _leading_non_word.sub("", text)
+    return _trailing_non_word.sub("", text)
 
 def strip_pos(text: str):
     return re.sub(r"(?:(?:b(?:(?:an)|)d)|(?:teil)|(?:folge)|(?:buch)|)\W*\d+\W*-*\W*", "", text, flags=re.UNICODE | re.I)
@@ -0,0 +1,71 @@
+import numpy as np
+from itertools import combinations
+from rapidfuzz import fuzz, process
+from backend.dependencies import get_scorer, prepare_name
+from backend.services.scrape import clean_title
+
+SIMILAR = 80 # same cutoff as the pairwise get_scorer() checks
+
+
+def similarity_matrix(names: list[str]) -> np.ndarray:
+    """get_scorer() for every pair of names, with each name prepared once and scored in one cdist call."""
+    prepared = [prepare_name(n) for n in names]
+    scores = process.cdist(prepared, prepared, scorer=fuzz.token_set_ratio, dtype=np.float64, workers=-1)
+    short = [i for i, n in enumerate(names) if len(n) < 3]
+    if short: # smart_ratio falls back to a plain ratio as soon as one side is that short
+        ratios = process.cdist([prepared[i] for i in short], prepared, scorer=fuzz.ratio, dtype=np.float64, workers=-1)
+        scores[short, :] = ratios
+        scores[:, short] = ratios.T
+    return scores
+
+def cluster_names(names: list[str], threshold: float = SIMILAR) -> list[list[int]]:
+    """
+    Group names that score above threshold, transitively (union-find over the similarity matrix).
+    Returns lists of indices into names, each in ascending order.
+    """
+    parent = list(range(len(names)))
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    if len(names) > 1:
+        rows, cols = np.nonzero(np.triu(similarity_matrix(names) > threshold, k=1))
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            ri, rj = find(i), find(j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+    clusters: dict[int, list[int]] = {}
+    for i in range(len(names)):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values())
+
+def find_duplicates(books: list[tuple[str, float]], series_name: str) -> list[tuple[int, int]]:
+    """
+    (keep, drop) index pairs of (name, position) books that are the same book twice within a series:
+    same position and either similar names or one of them being just "Series Name - Position".
+    Only books sharing a position are compared and every title is cleaned once.
+    """
+    buckets: dict[float, list[int]] = {}
+    for idx, (_, position) in enumerate(books):
+        if position:
+            buckets.setdefault(float(position), []).append(idx)
+    scorer = get_scorer()
+    pairs = []
+    for bucket in buckets.values():
+        if len(bucket) < 2: continue
+        empty = {i: clean_title(books[i][0], series_name, books[i][1], can_be_empty=True) == "" for i in bucket}
+        dropped = set()
+        for i, j in combinations(bucket, 2):
+            if i in dropped or j in dropped: continue
+            if empty[i]:
+                keep, drop = j, i
+            elif empty[j]:
+                keep, drop = i, j
+            elif scorer(books[i][0], books[j][0]) > SIMILAR:
+                keep, drop = (i, j) if len(books[i][0]) < len(books[j][0]) else (j, i)
+            else:
+                continue
+            dropped.add(drop)
+            pairs.append((keep, drop))
+    return pairs
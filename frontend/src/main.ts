@@ -90,6 +90,16 @@ export interface Series {
   key: string
   name: string
 }
+export interface ImportJob {
+  id: string
+  kind: string
+  target: string
+  status: 'queued' | 'running' | 'done' | 'failed' | 'canceled'
+  progress: Record<string, { done: number, total: number }>
+  result: any
+  error: string | null
+}
+
 export interface Indexer {
   name: string;
   url: string;
@@ -1,5 +1,8 @@
 import { ref } from "vue"
 import { notify } from "@kyvg/vue3-notification";
+import type { AxiosResponse } from "axios";
+import { api } from "@/main.ts"
+import type { ImportJob } from "@/main.ts"
 
 export function getInitials(name: string) {
   const names = name.split(' ')
@@ -79,4 +82,23 @@ export async function runBatch(keys: string[], requestFn:(key: string) => Promis
     })())
   }
   Promise.all(resets)
-}
\ No newline at end of file
+}
+
+export function importProgress(job: ImportJob) {
+  if (job.status === 'queued') return 'Queued'
+  return Object.entries(job.progress).map(([stage, p]) => `${stage} ${p.done}/${p.total}`).join(', ')
+}
+
+// Submits an import with background=true and polls it until it is finished, errors are thrown like axios errors
+export async function runImport(submit: () => Promise<AxiosResponse<ImportJob>>, onProgress?: (job: ImportJob) => void, intervalMs = 1000) {
+  let job = (await submit()).data
+  while (job.status === 'queued' || job.status === 'running') {
+    onProgress?.(job)
+    await new Promise(res => setTimeout(res, intervalMs))
+    job = (await api.get<ImportJob>(`/imports/${job.id}`)).data
+  }
+  if (job.status !== 'done') {
+    throw { response: { data: { detail: job.error ?? `Import ${job.status}` } } }
+  }
+  return job.result
+}